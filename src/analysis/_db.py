@@ -0,0 +1,153 @@
+"""
+Shared database helpers for the analysis modules.
+
+The shared scan of users, user_logs and ab_test_results runs once on DuckDB,
+which reads the SQLite database file directly through its sqlite extension;
+the analyses then work on the resulting DataFrames. When the extension is
+neither installed nor downloadable (e.g. offline), the tables are copied into
+DuckDB through sqlite3 instead.
+"""
+
+import sqlite3
+from pathlib import Path
+from typing import Dict
+import duckdb
+import pandas as pd
+
+
+# Tables the analyses read
+ANALYSIS_TABLES = ('users', 'user_logs', 'ab_test_results')
+
+
+def connect_sqlite(db_path: str = "data/app_data.db") -> sqlite3.Connection:
+    """
+    Open the SQLite database read-only.
+    
+    The analysis pipeline never writes through this connection, so it can be
+    used alongside other readers. Temp tables are kept in memory and the
+    database file is memory-mapped with a large page cache for scans over
+    user_logs.
+    
+    Args:
+        db_path: Path to the SQLite database
+    
+    Returns:
+        Read-only SQLite connection
+    """
+    conn = sqlite3.connect(f"{Path(db_path).resolve().as_uri()}?mode=ro", uri=True)
+    conn.executescript("""
+        PRAGMA temp_store = MEMORY;
+        PRAGMA mmap_size = 268435456;
+        PRAGMA cache_size = -200000;
+    """)
+    return conn
+
+
+def connect_duckdb(db_path: str = "data/app_data.db") -> duckdb.DuckDBPyConnection:
+    """
+    Open an in-memory DuckDB connection with the SQLite database attached.
+    
+    The SQLite tables are available under the `s` schema (e.g. `s.user_logs`).
+    An already installed sqlite extension is loaded without network access;
+    it is only downloaded if missing. If that fails too, the analysis tables
+    are copied into the `s` schema through sqlite3.
+    
+    Args:
+        db_path: Path to the SQLite database
+    
+    Returns:
+        DuckDB connection
+    """
+    con = duckdb.connect()
+    try:
+        con.execute("LOAD sqlite")
+    except duckdb.Error:
+        try:
+            con.execute("INSTALL sqlite; LOAD sqlite")
+        except duckdb.Error:
+            return _copy_sqlite_tables(con, db_path)
+    
+    escaped_path = db_path.replace("'", "''")
+    con.execute(f"ATTACH '{escaped_path}' AS s (TYPE SQLITE, READ_ONLY)")
+    return con
+
+
+def _copy_sqlite_tables(con: duckdb.DuckDBPyConnection, db_path: str) -> duckdb.DuckDBPyConnection:
+    """
+    Copy the analysis tables from SQLite into the `s` schema of a DuckDB connection.
+    
+    Fallback for environments without the DuckDB sqlite extension.
+    
+    Args:
+        con: DuckDB connection
+        db_path: Path to the SQLite database
+    
+    Returns:
+        The same DuckDB connection
+    """
+    conn = connect_sqlite(db_path)
+    con.execute("CREATE SCHEMA s")
+    for table in ANALYSIS_TABLES:
+        df = pd.read_sql_query(f"SELECT * FROM {table}", conn)
+        con.register('sqlite_table', df)
+        con.execute(f"CREATE TABLE s.{table} AS SELECT * FROM sqlite_table")
+        con.unregister('sqlite_table')
+    conn.close()
+    return con
+
+
+
+def load_analysis_context(db_path: str = "data/app_data.db") -> Dict[str, pd.DataFrame]:
+    """
+    Load the tables shared by all analyses in a single pass.
+    
+    Each log row carries its day offset from the user's signup date, which is
+    what the retention calculations key on. Event timestamps are stored as
+    Unix epoch seconds; databases generated before that store ISO 8601 text,
+    which is still accepted.
+    
+    Args:
+        db_path: Path to the SQLite database
+    
+    Returns:
+        Dictionary with 'users', 'logs' and 'ab' DataFrames
+    """
+    duck = connect_duckdb(db_path)
+    
+    column_types = dict(duck.execute(
+        "SELECT column_name, column_type FROM (DESCRIBE s.user_logs)"
+    ).fetchall())
+    if column_types['event_timestamp'] in ('VARCHAR', 'TEXT'):
+        event_timestamp = "CAST(ul.event_timestamp AS TIMESTAMP)"
+    else:
+        event_timestamp = "epoch_ms(CAST(ul.event_timestamp AS BIGINT) * 1000)"
+    
+    users = duck.execute("""
+        SELECT 
+            user_id,
+            CAST(signup_date AS TIMESTAMP) as signup_date,
+            channel,
+            segment
+        FROM s.users
+        ORDER BY user_id
+    """).df()
+    
+    logs = duck.execute(f"""
+        SELECT 
+            ul.user_id,
+            ul.event_name,
+            {event_timestamp} as event_timestamp,
+            ul.value,
+            CAST(date_diff('day', CAST(u.signup_date AS DATE), CAST({event_timestamp} AS DATE)) AS INTEGER) as day_offset
+        FROM s.user_logs ul
+        JOIN s.users u ON u.user_id = ul.user_id
+    """).df()
+    logs['event_name'] = logs['event_name'].astype('category')
+    
+    ab = duck.execute(
+        "SELECT user_id, group_name, is_converted FROM s.ab_test_results"
+    ).df()
+    
+    duck.close()
+    
+    return {'users': users, 'logs': logs, 'ab': ab}
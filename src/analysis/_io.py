@@ -0,0 +1,52 @@
+"""
+Shared output helpers for the analysis modules.
+
+Besides the JSON results, tabular result sections are written as uncompressed
+Feather (Arrow IPC) files next to the JSON file, so the dashboard can
+memory-map them into DataFrames instead of parsing JSON. Each file records the
+`analysis_timestamp` of the JSON it was written with, so readers can tell a
+stale copy from a current one.
+"""
+
+from pathlib import Path
+from typing import Dict, List
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+
+# Schema metadata key holding the analysis_timestamp of the matching JSON
+TIMESTAMP_KEY = b'analysis_timestamp'
+
+
+def table_path(output_path: str, section: str) -> Path:
+    """
+    Path of the Feather file holding one section of an analysis' results.
+    
+    Args:
+        output_path: Path of the analysis results JSON file
+        section: Name of the tabular result section
+    
+    Returns:
+        Path such as `segment_analysis.segment_statistics.feather`
+    """
+    return Path(output_path).with_suffix(f'.{section}.feather')
+
+
+def save_tables(output_path: str, tables: Dict[str, List[Dict]], analysis_timestamp: str) -> None:
+    """
+    Write tabular result sections as Feather files next to the results file.
+    
+    Files are left uncompressed so readers can memory-map them.
+    
+    Args:
+        output_path: Path of the analysis results JSON file
+        tables: Section name -> list of row dictionaries
+        analysis_timestamp: `analysis_timestamp` of the results written to output_path
+    """
+    for section, rows in tables.items():
+        table = pa.Table.from_pandas(pd.DataFrame.from_records(rows), preserve_index=False)
+        table = table.replace_schema_metadata({
+            **(table.schema.metadata or {}), TIMESTAMP_KEY: analysis_timestamp.encode()
+        })
+        feather.write_feather(table, table_path(output_path, section), compression='uncompressed')
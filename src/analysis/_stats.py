@@ -0,0 +1,66 @@
+"""
+Shared statistical helpers for the analysis modules.
+
+These functions operate on NumPy arrays so a whole batch of comparisons
+(e.g. one per retention day or per segment) is computed in a few array ops.
+"""
+
+from typing import Dict
+import numpy as np
+from scipy.special import ndtr
+
+
+# Critical value for alpha = 0.05, two-tailed
+Z_CRITICAL = 1.96
+
+
+def two_prop_ztest(conv_a, n_a, conv_b, n_b) -> Dict[str, np.ndarray]:
+    """
+    Two-proportion z-test of group B against group A, vectorized over arrays.
+    
+    Args:
+        conv_a: Conversions (successes) in group A
+        n_a: Total observations in group A
+        conv_b: Conversions (successes) in group B
+        n_b: Total observations in group B
+    
+    Returns:
+        Dictionary of arrays with the z-score, two-tailed p-value, Cohen's h,
+        95% confidence interval for the difference (p_b - p_a) and post-hoc
+        statistical power
+    """
+    conv_a = np.asarray(conv_a, dtype=np.float64)
+    n_a = np.asarray(n_a, dtype=np.float64)
+    conv_b = np.asarray(conv_b, dtype=np.float64)
+    n_b = np.asarray(n_b, dtype=np.float64)
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        p_a = conv_a / n_a
+        p_b = conv_b / n_b
+        diff = p_b - p_a
+        
+        # Pooled standard error under H0
+        p_pool = (conv_a + conv_b) / (n_a + n_b)
+        se_pool = np.sqrt(p_pool * (1 - p_pool) * (1 / n_a + 1 / n_b))
+        
+        z = np.where(se_pool > 0, diff / se_pool, 0.0)
+        p_value = 2 * (1 - ndtr(np.abs(z)))  # Two-tailed
+        
+        # Effect size (Cohen's h)
+        cohens_h = 2 * np.arcsin(np.sqrt(p_b)) - 2 * np.arcsin(np.sqrt(p_a))
+        
+        # Unpooled standard error for the confidence interval
+        se_diff = np.sqrt(p_a * (1 - p_a) / n_a + p_b * (1 - p_b) / n_b)
+        
+        # Power = P(reject H0 | H1 is true), using the normal approximation
+        ncp = np.where(se_pool > 0, np.abs(diff) / se_pool, 0.0)
+        power = 1 - ndtr(Z_CRITICAL - ncp) + ndtr(-Z_CRITICAL - ncp)
+    
+    return {
+        'z': z,
+        'p': p_value,
+        'cohens_h': cohens_h,
+        'ci_lo': diff - Z_CRITICAL * se_diff,
+        'ci_hi': diff + Z_CRITICAL * se_diff,
+        'power': power
+    }
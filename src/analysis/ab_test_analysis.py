@@ -5,18 +5,23 @@ This module performs comprehensive statistical testing on A/B test results inclu
 two-proportion z-test, chi-square test, effect size calculation, and power analysis.
 """
 
-import sqlite3
-import json
-import math
-from typing import Dict
+import sys
+import orjson
+from pathlib import Path
+from typing import Dict, Optional
 import pandas as pd
 from scipy import stats
-import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from analysis._db import load_analysis_context
+from analysis._stats import two_prop_ztest
 
 
 def analyze_ab_test(
     db_path: str = "data/app_data.db",
-    output_path: str = "data/analysis_results/ab_test_analysis.json"
+    output_path: str = "data/analysis_results/ab_test_analysis.json",
+    context: Optional[Dict[str, pd.DataFrame]] = None
 ) -> Dict:
     """
     Perform statistical analysis on A/B test results.
@@ -24,35 +29,27 @@ def analyze_ab_test(
     Args:
         db_path: Path to the SQLite database
         output_path: Path to save analysis results
+        context: Preloaded tables from load_analysis_context (loaded from
+            db_path if not given)
         
     Returns:
         Dictionary containing A/B test analysis results
     """
-    conn = sqlite3.connect(db_path)
+    if context is None:
+        context = load_analysis_context(db_path)
     
     print("Analyzing A/B test results...")
     
-    # Get conversion data
-    query = """
-    SELECT 
-        group_name,
-        COUNT(*) as total_users,
-        SUM(is_converted) as conversions
-    FROM ab_test_results
-    GROUP BY group_name
-    """
-    
-    df = pd.read_sql_query(query, conn)
-    conn.close()
+    # Get conversion data (two rows, unpacked into plain Python ints)
+    conversions_df = context['ab'].groupby('group_name')['is_converted'].agg(['count', 'sum'])
+    groups = {
+        group_name: (int(total_users), int(conversions))
+        for group_name, total_users, conversions in conversions_df.itertuples(name=None)
+    }
     
     # Extract data for both groups
-    group_a = df[df['group_name'] == 'A'].iloc[0]
-    group_b = df[df['group_name'] == 'B'].iloc[0]
-    
-    n_a = group_a['total_users']
-    n_b = group_b['total_users']
-    conv_a = group_a['conversions']
-    conv_b = group_b['conversions']
+    n_a, conv_a = groups['A']
+    n_b, conv_b = groups['B']
     
     p_a = conv_a / n_a
     p_b = conv_b / n_b
@@ -60,13 +57,11 @@ def analyze_ab_test(
     print(f"  Control (A): {conv_a}/{n_a} = {p_a:.4f} ({p_a*100:.2f}%)")
     print(f"  Treatment (B): {conv_b}/{n_b} = {p_b:.4f} ({p_b*100:.2f}%)")
     
-    # Calculate pooled proportion for z-test
-    p_pool = (conv_a + conv_b) / (n_a + n_b)
-    se_pool = math.sqrt(p_pool * (1 - p_pool) * (1/n_a + 1/n_b))
+    test = two_prop_ztest([conv_a], [n_a], [conv_b], [n_b])
     
     # Two-proportion z-test
-    z_score = (p_b - p_a) / se_pool if se_pool > 0 else 0
-    p_value_z = 2 * (1 - stats.norm.cdf(abs(z_score)))  # Two-tailed
+    z_score = float(test['z'][0])
+    p_value_z = float(test['p'][0])  # Two-tailed
     
     print(f"\nTwo-proportion z-test:")
     print(f"  Z-score: {z_score:.4f}")
@@ -81,9 +76,7 @@ def analyze_ab_test(
     print(f"  P-value: {p_value_chi2:.4f}")
     
     # Effect size (Cohen's h)
-    phi_a = 2 * math.asin(math.sqrt(p_a))
-    phi_b = 2 * math.asin(math.sqrt(p_b))
-    cohens_h = phi_b - phi_a
+    cohens_h = float(test['cohens_h'][0])
     
     print(f"\nEffect size (Cohen's h): {cohens_h:.4f}")
     
@@ -95,24 +88,13 @@ def analyze_ab_test(
     print(f"Absolute lift: {absolute_lift:.2f} percentage points")
     
     # 95% Confidence interval for difference
-    se_diff = math.sqrt(p_a * (1 - p_a) / n_a + p_b * (1 - p_b) / n_b)
-    ci_lower = (p_b - p_a) - 1.96 * se_diff
-    ci_upper = (p_b - p_a) + 1.96 * se_diff
+    ci_lower = float(test['ci_lo'][0])
+    ci_upper = float(test['ci_hi'][0])
     
     print(f"\n95% CI for difference: [{ci_lower*100:.2f}%, {ci_upper*100:.2f}%]")
     
-    # Statistical power calculation (post-hoc)
-    # Using normal approximation
-    effect_size = abs(p_b - p_a)
-    pooled_p = (n_a * p_a + n_b * p_b) / (n_a + n_b)
-    pooled_se = math.sqrt(pooled_p * (1 - pooled_p) * (1/n_a + 1/n_b))
-    
-    # Calculate non-centrality parameter
-    ncp = effect_size / pooled_se if pooled_se > 0 else 0
-    
-    # Power = P(reject H0 | H1 is true)
-    critical_value = 1.96  # For alpha = 0.05, two-tailed
-    power = 1 - stats.norm.cdf(critical_value - ncp) + stats.norm.cdf(-critical_value - ncp)
+    # Statistical power calculation (post-hoc, normal approximation)
+    power = float(test['power'][0])
     
     print(f"Statistical power: {power:.4f} ({power*100:.2f}%)")
     
@@ -157,11 +139,7 @@ def analyze_ab_test(
         'analysis_timestamp': pd.Timestamp.now().isoformat()
     }
     
-    # Save results
-    import os
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    with open(output_path, 'w') as f:
-        json.dump(results, f, indent=2)
+    save_ab_test_results(results, output_path)
     
     print(f"\n[OK] A/B test analysis complete. Results saved to {output_path}")
     print(f"Recommendation: {results['recommendation']}")
@@ -169,5 +147,19 @@ def analyze_ab_test(
     return results
 
 
+def save_ab_test_results(results: Dict, output_path: str) -> None:
+    """
+    Write A/B test results as JSON.
+    
+    Args:
+        results: A/B test analysis results
+        output_path: Path to save analysis results
+    """
+    import os
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    with open(output_path, 'wb') as f:
+        f.write(orjson.dumps(results, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+
+
 if __name__ == "__main__":
     analyze_ab_test()
@@ -5,17 +5,25 @@ This module calculates retention metrics including D1, D3, D7, D14, D30 retentio
 cohort analysis, and comparison between reward-earning and non-reward users.
 """
 
-import sqlite3
-import json
+import sys
+import orjson
 from datetime import datetime, timedelta
-from typing import Dict, List, Tuple
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import numpy as np
 import pandas as pd
-from scipy import stats
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from analysis._db import load_analysis_context
+from analysis._io import save_tables
+from analysis._stats import two_prop_ztest
 
 
 def calculate_retention(
     db_path: str = "data/app_data.db",
-    output_path: str = "data/analysis_results/retention_analysis.json"
+    output_path: str = "data/analysis_results/retention_analysis.json",
+    context: Optional[Dict[str, pd.DataFrame]] = None
 ) -> Dict:
     """
     Calculate retention metrics and perform cohort analysis.
@@ -23,44 +31,59 @@ def calculate_retention(
     Args:
         db_path: Path to the SQLite database
         output_path: Path to save analysis results
+        context: Preloaded tables from load_analysis_context (loaded from
+            db_path if not given)
         
     Returns:
         Dictionary containing retention analysis results
     """
-    conn = sqlite3.connect(db_path)
+    if context is None:
+        context = load_analysis_context(db_path)
     
     print("Calculating retention metrics...")
     
-    # Calculate overall retention rates
+    # Calculate overall and reward-split retention rates in a single pass over
+    # the raw event stream. Each event carries an integer day offset from the
+    # user's signup date; users are then flagged once per retention day and
+    # aggregated by user type. Overall retention is the sum of both user types.
     retention_days = [1, 3, 7, 14, 30]
-    overall_retention = {}
     
-    for day in retention_days:
-        query = f"""
-        WITH user_signup AS (
-            SELECT user_id, signup_date
-            FROM users
-        ),
-        user_activity AS (
-            SELECT DISTINCT 
-                ul.user_id,
-                DATE(ul.event_timestamp) as activity_date
-            FROM user_logs ul
+    users_df = context['users']
+    logs_df = context['logs']
+    day_offset = logs_df['day_offset']
+    
+    # Reward users earned a reward on their signup day
+    reward_users = logs_df.loc[
+        (day_offset == 0) & (logs_df['event_name'] == 'reward_earned'), 'user_id'
+    ].unique()
+    
+    # User is retained on day N if they had any activity exactly N days after signup
+    retained_flags = pd.DataFrame(
+        {day: day_offset.eq(day) for day in retention_days}
+    ).groupby(logs_df['user_id']).any()
+    retained_flags = retained_flags.reindex(users_df['user_id'], fill_value=False)
+    
+    # Only users whose day N has already elapsed are counted for day N
+    today = pd.Timestamp.now(tz='UTC').tz_localize(None).normalize()
+    days_since_signup = (today - users_df['signup_date']).dt.days.to_numpy()
+    
+    user_retention = pd.DataFrame({
+        'user_type': np.where(
+            users_df['user_id'].isin(reward_users), 'reward', 'no_reward'
         )
-        SELECT 
-            COUNT(DISTINCT us.user_id) as total_users,
-            COUNT(DISTINCT CASE 
-                WHEN DATE(ua.activity_date) = DATE(us.signup_date, '+{day} days')
-                THEN us.user_id 
-            END) as retained_users
-        FROM user_signup us
-        LEFT JOIN user_activity ua ON us.user_id = ua.user_id
-        WHERE DATE(us.signup_date, '+{day} days') <= DATE('now')
-        """
-        
-        df = pd.read_sql_query(query, conn)
-        total = df['total_users'].iloc[0]
-        retained = df['retained_users'].iloc[0]
+    })
+    for day in retention_days:
+        eligible = days_since_signup >= day
+        user_retention[f'd{day}_total'] = eligible
+        user_retention[f'd{day}_retained'] = eligible & retained_flags[day].to_numpy()
+    
+    retention_df = user_retention.groupby('user_type').sum()
+    overall_df = retention_df.sum()
+    
+    overall_retention = {}
+    for day in retention_days:
+        total = overall_df[f'd{day}_total']
+        retained = overall_df[f'd{day}_retained']
         retention_rate = (retained / total * 100) if total > 0 else 0
         
         overall_retention[f'D{day}'] = {
@@ -73,47 +96,27 @@ def calculate_retention(
     # Compare reward vs non-reward users
     print("\nComparing reward-earning vs non-reward users...")
     
-    reward_comparison = {}
-    for day in retention_days:
-        query = f"""
-        WITH user_signup AS (
-            SELECT user_id, signup_date
-            FROM users
-        ),
-        reward_users AS (
-            SELECT DISTINCT user_id
-            FROM user_logs
-            WHERE event_name = 'reward_earned'
-            AND DATE(event_timestamp) = DATE((SELECT signup_date FROM users WHERE users.user_id = user_logs.user_id))
-        ),
-        user_activity AS (
-            SELECT DISTINCT 
-                ul.user_id,
-                DATE(ul.event_timestamp) as activity_date
-            FROM user_logs ul
-        )
-        SELECT 
-            CASE WHEN ru.user_id IS NOT NULL THEN 'reward' ELSE 'no_reward' END as user_type,
-            COUNT(DISTINCT us.user_id) as total_users,
-            COUNT(DISTINCT CASE 
-                WHEN DATE(ua.activity_date) = DATE(us.signup_date, '+{day} days')
-                THEN us.user_id 
-            END) as retained_users
-        FROM user_signup us
-        LEFT JOIN reward_users ru ON us.user_id = ru.user_id
-        LEFT JOIN user_activity ua ON us.user_id = ua.user_id
-        WHERE DATE(us.signup_date, '+{day} days') <= DATE('now')
-        GROUP BY user_type
-        """
-        
-        df = pd.read_sql_query(query, conn)
+    # Two-proportion z-test (reward vs no reward) for all retention days at once
+    if {'reward', 'no_reward'} <= set(retention_df.index):
+        total_cols = [f'd{day}_total' for day in retention_days]
+        retained_cols = [f'd{day}_retained' for day in retention_days]
+        r_tot = retention_df.loc['reward', total_cols].to_numpy(dtype=float)
+        r_ret = retention_df.loc['reward', retained_cols].to_numpy(dtype=float)
+        n_tot = retention_df.loc['no_reward', total_cols].to_numpy(dtype=float)
+        n_ret = retention_df.loc['no_reward', retained_cols].to_numpy(dtype=float)
         
+        test = two_prop_ztest(n_ret, n_tot, r_ret, r_tot)
+        z_scores = test['z']
+        p_values = test['p']
+    
+    reward_comparison = {}
+    for i, day in enumerate(retention_days):
         comparison = {}
-        for _, row in df.iterrows():
-            user_type = row['user_type']
-            total = row['total_users']
-            retained = row['retained_users']
-            retention_rate = (retained / total * 100) if total > 0 else 0
+        day_df = retention_df[[f'd{day}_total', f'd{day}_retained']]
+        for user_type, total, retained in day_df.itertuples(name=None):
+            if total == 0:
+                continue
+            retention_rate = retained / total * 100
             
             comparison[user_type] = {
                 'total_users': int(total),
@@ -121,17 +124,11 @@ def calculate_retention(
                 'retention_rate': round(retention_rate, 2)
             }
         
-        # Calculate statistical significance
+        # Attach statistical significance
         if 'reward' in comparison and 'no_reward' in comparison:
-            contingency_table = [
-                [comparison['reward']['retained_users'], 
-                 comparison['reward']['total_users'] - comparison['reward']['retained_users']],
-                [comparison['no_reward']['retained_users'], 
-                 comparison['no_reward']['total_users'] - comparison['no_reward']['retained_users']]
-            ]
-            chi2, p_value, dof, expected = stats.chi2_contingency(contingency_table)
+            p_value = p_values[i]
             comparison['statistical_test'] = {
-                'chi2': round(float(chi2), 4),
+                'z_score': round(float(z_scores[i]), 4),
                 'p_value': round(float(p_value), 4),
                 'significant': bool(p_value < 0.05)
             }
@@ -142,45 +139,21 @@ def calculate_retention(
     
     # Cohort analysis
     print("\nPerforming cohort analysis...")
-    cohort_query = """
-    WITH user_cohorts AS (
-        SELECT 
-            user_id,
-            DATE(signup_date, 'start of week') as cohort_week,
-            signup_date
-        FROM users
-    ),
-    user_activity AS (
-        SELECT DISTINCT 
-            user_id,
-            DATE(event_timestamp) as activity_date
-        FROM user_logs
-    )
-    SELECT 
-        uc.cohort_week,
-        COUNT(DISTINCT uc.user_id) as cohort_size,
-        SUM(CASE WHEN ua.activity_date = DATE(uc.signup_date, '+1 day') THEN 1 ELSE 0 END) as d1_retained,
-        SUM(CASE WHEN ua.activity_date = DATE(uc.signup_date, '+7 days') THEN 1 ELSE 0 END) as d7_retained,
-        SUM(CASE WHEN ua.activity_date = DATE(uc.signup_date, '+30 days') THEN 1 ELSE 0 END) as d30_retained
-    FROM user_cohorts uc
-    LEFT JOIN user_activity ua ON uc.user_id = ua.user_id
-    GROUP BY uc.cohort_week
-    ORDER BY uc.cohort_week
-    """
+    # Cohorts are signup weeks starting on Monday; cohort retention counts
+    # every user regardless of whether the day has elapsed
+    cohort_df = pd.DataFrame({
+        'cohort_week': users_df['signup_date'].dt.to_period('W-SUN').dt.start_time.dt.strftime('%Y-%m-%d').to_numpy(),
+        'd1_retained': retained_flags[1].to_numpy(),
+        'd7_retained': retained_flags[7].to_numpy(),
+        'd30_retained': retained_flags[30].to_numpy()
+    }).groupby('cohort_week').agg(
+        cohort_size=('d1_retained', 'size'),
+        d1_retained=('d1_retained', 'sum'),
+        d7_retained=('d7_retained', 'sum'),
+        d30_retained=('d30_retained', 'sum')
+    ).reset_index()
     
-    cohort_df = pd.read_sql_query(cohort_query, conn)
-    # Convert numpy types to Python types for JSON serialization
-    cohort_analysis = []
-    for _, row in cohort_df.iterrows():
-        cohort_analysis.append({
-            'cohort_week': str(row['cohort_week']),
-            'cohort_size': int(row['cohort_size']),
-            'd1_retained': int(row['d1_retained']),
-            'd7_retained': int(row['d7_retained']),
-            'd30_retained': int(row['d30_retained'])
-        })
-    
-    conn.close()
+    cohort_analysis = cohort_df.to_dict(orient='records')
     
     # Compile results
     results = {
@@ -190,16 +163,31 @@ def calculate_retention(
         'analysis_timestamp': datetime.now().isoformat()
     }
     
-    # Save results
-    import os
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    with open(output_path, 'w') as f:
-        json.dump(results, f, indent=2)
+    save_retention_results(results, output_path)
     
     print(f"\n[OK] Retention analysis complete. Results saved to {output_path}")
     
     return results
 
 
+def save_retention_results(results: Dict, output_path: str) -> None:
+    """
+    Write retention results as JSON, plus their Feather tables.
+    
+    Args:
+        results: Retention analysis results
+        output_path: Path to save analysis results
+    """
+    import os
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    with open(output_path, 'wb') as f:
+        f.write(orjson.dumps(results, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+    save_tables(output_path, {
+        'overall_retention': [
+            {'day': day, **metrics} for day, metrics in results['overall_retention'].items()
+        ]
+    }, results['analysis_timestamp'])
+
+
 if __name__ == "__main__":
     calculate_retention()
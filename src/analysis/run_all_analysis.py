@@ -1,27 +1,168 @@
 """
 Main analysis pipeline.
 
-This script runs all analysis modules in sequence and generates a comprehensive report.
+This script runs all analysis modules in parallel and generates a comprehensive report.
 """
 
+import io
 import sys
 import time
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
 from pathlib import Path
+from typing import Callable, Dict, Optional, TextIO, Tuple
+import orjson
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from analysis.retention_analysis import calculate_retention
-from analysis.ab_test_analysis import analyze_ab_test
-from analysis.segment_analysis import analyze_segments
+from analysis._db import connect_sqlite, load_analysis_context
+from analysis.retention_analysis import calculate_retention, save_retention_results
+from analysis.ab_test_analysis import analyze_ab_test, save_ab_test_results
+from analysis.segment_analysis import analyze_segments, save_segment_results
 
 
-def run_all_analysis(db_path: str = "data/app_data.db") -> None:
+class _ThreadOutput(io.TextIOBase):
+    """
+    Stand-in for sys.stdout that keeps each worker thread's output apart.
+    
+    Writes from a thread with a registered buffer go to that buffer; all
+    other writes go straight to the wrapped stream.
+    """
+    
+    def __init__(self, stream: TextIO):
+        self.stream = stream
+        self.buffers: Dict[int, io.StringIO] = {}
+    
+    def writable(self) -> bool:
+        return True
+    
+    def write(self, text: str) -> int:
+        return self.buffers.get(threading.get_ident(), self.stream).write(text)
+    
+    def flush(self) -> None:
+        self.stream.flush()
+
+
+def _run_captured(output: _ThreadOutput, analysis_fn: Callable, *args, **kwargs) -> Tuple[Dict, str]:
+    """
+    Run an analysis while capturing what it prints.
+    
+    Args:
+        output: Installed _ThreadOutput to register the capture buffer with
+        analysis_fn: Analysis function to run
+        *args, **kwargs: Arguments for analysis_fn
+        
+    Returns:
+        (results, printed output)
+    """
+    thread_id = threading.get_ident()
+    output.buffers[thread_id] = io.StringIO()
+    try:
+        results = analysis_fn(*args, **kwargs)
+    finally:
+        buffer = output.buffers.pop(thread_id)
+    return results, buffer.getvalue()
+
+
+def _fingerprint(db_path: str) -> str:
+    """
+    Compute a fingerprint of the database contents and the analysis code.
+    
+    Args:
+        db_path: Path to the SQLite database
+        
+    Returns:
+        Hex digest that changes whenever the analysed tables or any module of
+        the analysis package change
+    """
+    conn = connect_sqlite(db_path)
+    state = conn.execute("""
+    SELECT 
+        (SELECT COUNT(*) FROM users),
+        (SELECT MAX(signup_date) FROM users),
+        (SELECT COUNT(*) FROM user_logs),
+        (SELECT MAX(event_timestamp) FROM user_logs),
+        (SELECT COUNT(*) FROM ab_test_results),
+        (SELECT SUM(is_converted) FROM ab_test_results)
+    """).fetchone()
+    conn.close()
+    
+    # Retention eligibility and time-based features depend on the current date
+    today = datetime.now(timezone.utc).date().isoformat()
+    digest = hashlib.blake2b(str((state, today)).encode(), digest_size=16)
+    for path in sorted(Path(__file__).parent.glob('*.py')):
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def _load_cached(output_path: str, fingerprint: str) -> Optional[Dict]:
+    """
+    Load an analysis' saved results if they were computed for this fingerprint.
+    
+    The fingerprint and results are stored in a `.cache.json` sidecar next to
+    the analysis output file, so the output file itself may have been
+    overwritten or removed since.
+    
+    Args:
+        output_path: Path of the analysis results file
+        fingerprint: Cache key for the current database state and arguments
+        
+    Returns:
+        Cached results dictionary, or None on a cache miss
+    """
+    cache_path = Path(output_path).with_suffix('.cache.json')
+    if not cache_path.exists():
+        return None
+    
+    with open(cache_path, 'rb') as f:
+        cached = orjson.loads(f.read())
+    if cached.get('fingerprint') != fingerprint:
+        return None
+    
+    return cached['results']
+
+
+def _save_cached(output_path: str, fingerprint: str, results: Dict) -> None:
+    """
+    Store an analysis' results in its `.cache.json` sidecar.
+    
+    Args:
+        output_path: Path of the analysis results file
+        fingerprint: Cache key for the current database state and arguments
+        results: Analysis results dictionary
+    """
+    cache_path = Path(output_path).with_suffix('.cache.json')
+    with open(cache_path, 'wb') as f:
+        f.write(orjson.dumps(
+            {'fingerprint': fingerprint, 'results': results},
+            option=orjson.OPT_SERIALIZE_NUMPY
+        ))
+
+
+def run_all_analysis(db_path: str = "data/app_data.db", use_cache: bool = True) -> None:
     """
     Run complete analysis pipeline.
     
+    users, user_logs and ab_test_results are loaded once and shared by all
+    analyses, which run in parallel threads over the same DataFrames. Each
+    analysis' progress output is captured and printed in pipeline order.
+    
     Args:
         db_path: Path to the SQLite database
+        use_cache: Reuse saved results of analyses whose inputs are unchanged
     """
+    # name -> (step title, analysis function, results writer, output path, extra arguments)
+    analyses = {
+        'retention': ("retention", calculate_retention, save_retention_results,
+                      "data/analysis_results/retention_analysis.json", {}),
+        'ab_test': ("A/B test", analyze_ab_test, save_ab_test_results,
+                    "data/analysis_results/ab_test_analysis.json", {}),
+        'segment': ("segment", analyze_segments, save_segment_results,
+                    "data/analysis_results/segment_analysis.json", {'n_clusters': 3})
+    }
+    
     print("=" * 60)
     print("DATA ANALYSIS PIPELINE")
     print("=" * 60)
@@ -29,23 +170,55 @@ def run_all_analysis(db_path: str = "data/app_data.db") -> None:
     
     start_time = time.time()
     
-    # Step 1: Retention analysis
-    print("[1/3] Running retention analysis...")
-    print("-" * 60)
-    retention_results = calculate_retention(db_path)
-    print()
+    results = {}
+    cache_keys = {}
+    if use_cache:
+        fingerprint = _fingerprint(db_path)
+        for name, (_, _, save_results, output_path, kwargs) in analyses.items():
+            cache_keys[name] = f"{fingerprint}:{sorted(kwargs.items())}"
+            cached = _load_cached(output_path, cache_keys[name])
+            if cached is not None:
+                # A standalone run may have left other results in the output
+                # files; rewrite them from the cache
+                save_results(cached, output_path)
+                results[name] = cached
     
-    # Step 2: A/B test analysis
-    print("[2/3] Running A/B test analysis...")
-    print("-" * 60)
-    ab_test_results = analyze_ab_test(db_path)
-    print()
+    pending = [name for name in analyses if name not in results]
+    if pending:
+        print("Loading users, behavior logs and A/B test data...")
+        context = load_analysis_context(db_path)
+        print(f"Running {', '.join(pending)} analysis in parallel...")
+        print()
     
-    # Step 3: Segment analysis
-    print("[3/3] Running segment analysis...")
-    print("-" * 60)
-    segment_results = analyze_segments(db_path, n_clusters=3)
-    print()
+    output = _ThreadOutput(sys.stdout)
+    sys.stdout = output
+    try:
+        with ThreadPoolExecutor(max_workers=max(len(pending), 1)) as executor:
+            futures = {}
+            for name in pending:
+                _, analysis_fn, _, output_path, kwargs = analyses[name]
+                futures[name] = executor.submit(
+                    _run_captured, output, analysis_fn, db_path, output_path,
+                    context=context, **kwargs
+                )
+            
+            for step, (name, (title, _, _, output_path, _)) in enumerate(analyses.items(), 1):
+                print(f"[{step}/{len(analyses)}] Running {title} analysis...")
+                print("-" * 60)
+                if name in futures:
+                    results[name], log = futures[name].result()
+                    print(log, end='')
+                    if use_cache:
+                        _save_cached(output_path, cache_keys[name], results[name])
+                else:
+                    print(f"  Database unchanged, using cached results from {output_path}")
+                print()
+    finally:
+        sys.stdout = output.stream
+    
+    retention_results = results['retention']
+    ab_test_results = results['ab_test']
+    segment_results = results['segment']
     
     elapsed_time = time.time() - start_time
     
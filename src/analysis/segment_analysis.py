@@ -5,21 +5,30 @@ This module performs K-means clustering on user behavior features and analyzes
 segment characteristics, retention, and heterogeneous treatment effects.
 """
 
-import sqlite3
-import json
-from typing import Dict, List
+import sys
+import orjson
+from pathlib import Path
+from typing import Dict, List, Optional
+import duckdb
 import pandas as pd
 import numpy as np
-from sklearn.cluster import KMeans
+from sklearn.cluster import KMeans, MiniBatchKMeans
 from sklearn.preprocessing import StandardScaler
 from sklearn.metrics import silhouette_score
 from datetime import datetime
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from analysis._db import load_analysis_context
+from analysis._io import save_tables
+from analysis._stats import two_prop_ztest
+
 
 def analyze_segments(
     db_path: str = "data/app_data.db",
     output_path: str = "data/analysis_results/segment_analysis.json",
-    n_clusters: int = 3
+    n_clusters: int = 3,
+    context: Optional[Dict[str, pd.DataFrame]] = None
 ) -> Dict:
     """
     Perform user segmentation using K-means clustering and analyze segments.
@@ -28,47 +37,52 @@ def analyze_segments(
         db_path: Path to the SQLite database
         output_path: Path to save analysis results
         n_clusters: Number of clusters for K-means
+        context: Preloaded tables from load_analysis_context (loaded from
+            db_path if not given)
         
     Returns:
         Dictionary containing segmentation analysis results
     """
-    conn = sqlite3.connect(db_path)
+    if context is None:
+        context = load_analysis_context(db_path)
     
     print("Extracting user behavior features...")
     
-    # Feature engineering query
-    query = """
-    WITH user_features AS (
+    users_df = context['users']
+    logs_df = context['logs']
+    
+    # Feature engineering: one multi-threaded DuckDB aggregation over the
+    # preloaded DataFrames (scanned in place), with users that have no events
+    # filled in as zeros
+    duck = duckdb.connect()
+    duck.register('users', users_df)
+    duck.register('logs', logs_df)
+    user_features = duck.execute("""
         SELECT 
-            u.user_id,
-            u.signup_date,
-            u.channel,
-            u.segment as initial_segment,
-            COUNT(ul.log_id) as total_events,
-            COUNT(DISTINCT DATE(ul.event_timestamp)) as active_days,
-            JULIANDAY('now') - JULIANDAY(u.signup_date) as days_since_signup,
-            SUM(CASE WHEN ul.event_name = 'reward_earned' THEN 1 ELSE 0 END) as reward_count,
-            SUM(CASE WHEN ul.event_name = 'reward_earned' THEN ul.value ELSE 0 END) as total_reward_value,
-            SUM(CASE WHEN ul.event_name = 'activity_completed' THEN 1 ELSE 0 END) as activities_completed,
-            MIN(CASE WHEN ul.event_name = 'reward_earned' 
-                THEN JULIANDAY(ul.event_timestamp) - JULIANDAY(u.signup_date) 
-                ELSE NULL END) as days_to_first_reward
+            COUNT(l.user_id) as total_events,
+            COUNT(DISTINCT l.day_offset) as active_days,
+            COUNT(*) FILTER (WHERE l.event_name = 'reward_earned') as reward_count,
+            COALESCE(SUM(l.value) FILTER (WHERE l.event_name = 'reward_earned'), 0) as total_reward_value,
+            COUNT(*) FILTER (WHERE l.event_name = 'activity_completed') as activities_completed,
+            MIN(l.event_timestamp) FILTER (WHERE l.event_name = 'reward_earned') as first_reward_at
         FROM users u
-        LEFT JOIN user_logs ul ON u.user_id = ul.user_id
+        LEFT JOIN logs l ON l.user_id = u.user_id
         GROUP BY u.user_id
+        ORDER BY u.user_id
+    """).df()
+    duck.close()
+    
+    now = pd.Timestamp.now(tz='UTC').tz_localize(None)
+    df = users_df.rename(columns={'segment': 'initial_segment'}).assign(
+        **{col: user_features[col].to_numpy() for col in user_features.columns}
     )
-    SELECT 
-        *,
-        CASE WHEN days_since_signup > 0 
-            THEN CAST(total_events AS FLOAT) / days_since_signup 
-            ELSE 0 END as avg_daily_events,
-        CASE WHEN days_since_signup > 0 
-            THEN CAST(active_days AS FLOAT) / days_since_signup 
-            ELSE 0 END as activity_ratio
-    FROM user_features
-    """
+    df['days_since_signup'] = (now - df['signup_date']) / pd.Timedelta(days=1)
+    df['days_to_first_reward'] = (df['first_reward_at'] - df['signup_date']) / pd.Timedelta(days=1)
+    df = df.drop(columns='first_reward_at')
     
-    df = pd.read_sql_query(query, conn)
+    has_history = df['days_since_signup'] > 0
+    df['avg_daily_events'] = np.where(has_history, df['total_events'] / df['days_since_signup'], 0)
+    df['activity_ratio'] = np.where(has_history, df['active_days'] / df['days_since_signup'], 0)
     
     print(f"  Extracted features for {len(df)} users")
     
@@ -83,41 +97,58 @@ def analyze_segments(
         'activity_ratio'
     ]
     
-    # Fill NaN values
-    df[feature_cols] = df[feature_cols].fillna(0)
-    
-    X = df[feature_cols].values
+    X = np.column_stack([df[col].to_numpy(np.float64, copy=False) for col in feature_cols])
     
-    # Standardize features
-    scaler = StandardScaler()
+    # Standardize features (in place, X is not used afterwards)
+    scaler = StandardScaler(copy=False)
     X_scaled = scaler.fit_transform(X)
     
+    # The elbow sweep runs on a float32 copy at half the memory. The final fit
+    # stays on float64, where float32 rounding moves users between clusters
+    X_sweep = X_scaled.astype(np.float32)
+    
     # Determine optimal number of clusters using Elbow Method
     print("\nDetermining optimal number of clusters...")
     inertias = []
-    silhouette_scores = []
     K_range = range(2, 8)
     
+    # The sweep is informational only. Each k is warm-started from the previous
+    # solution plus the point farthest from its centers and run to convergence.
+    # A single start can settle in a worse local optimum than the 10 restarts
+    # of the final fit, so the inertias are upper bounds
+    kmeans = None
     for k in K_range:
-        kmeans = KMeans(n_clusters=k, random_state=42, n_init=10)
-        kmeans.fit(X_scaled)
+        if kmeans is None:
+            kmeans = MiniBatchKMeans(n_clusters=k, random_state=42, n_init=3, batch_size=4096)
+        else:
+            farthest = kmeans.transform(X_sweep).min(axis=1).argmax()
+            init = np.vstack([kmeans.cluster_centers_, X_sweep[farthest]])
+            kmeans = KMeans(n_clusters=k, init=init, n_init=1, random_state=42)
+        kmeans.fit(X_sweep)
         inertias.append(kmeans.inertia_)
-        silhouette_scores.append(silhouette_score(X_scaled, kmeans.labels_))
     
     elbow_data = [
-        {'k': k, 'inertia': inertia, 'silhouette_score': score}
-        for k, inertia, score in zip(K_range, inertias, silhouette_scores)
+        {'k': k, 'inertia': inertia}
+        for k, inertia in zip(K_range, inertias)
     ]
     
-    print("  K | Inertia | Silhouette")
+    print("  K | Inertia (approximate, warm-started sweep)")
     for item in elbow_data:
-        print(f"  {item['k']} | {item['inertia']:.2f} | {item['silhouette_score']:.4f}")
+        print(f"  {item['k']} | {item['inertia']:.2f}")
     
     # Perform K-means with specified number of clusters
     print(f"\nPerforming K-means clustering with {n_clusters} clusters...")
     kmeans = KMeans(n_clusters=n_clusters, random_state=42, n_init=10)
     df['cluster'] = kmeans.fit_predict(X_scaled)
     
+    # Silhouette score of the chosen clustering only, sampled to keep it cheap
+    # on large user bases
+    silhouette = silhouette_score(
+        X_scaled, kmeans.labels_,
+        sample_size=min(5000, len(X_scaled)), random_state=42
+    )
+    print(f"  Silhouette score: {silhouette:.4f}")
+    
     # Analyze segment characteristics
     print("\nAnalyzing segment characteristics...")
     segment_stats = []
@@ -126,7 +157,7 @@ def analyze_segments(
         cluster_df = df[df['cluster'] == cluster_id]
         
         stats = {
-            'cluster_id': int(cluster_id),
+            'cluster_id': cluster_id,
             'size': len(cluster_df),
             'percentage': round(len(cluster_df) / len(df) * 100, 2),
             'avg_total_events': round(cluster_df['total_events'].mean(), 2),
@@ -147,89 +178,84 @@ def analyze_segments(
     # Segment-specific retention (D7)
     print("\nCalculating segment-specific D7 retention...")
     
-    # Save cluster assignments to database temporarily
-    df[['user_id', 'cluster']].to_sql('temp_clusters', conn, if_exists='replace', index=False)
+    # Only users whose day 7 has already elapsed are counted
+    today = now.normalize()
+    eligible = (today - df['signup_date']).dt.days >= 7
+    d7_active_users = logs_df.loc[logs_df['day_offset'] == 7, 'user_id'].unique()
     
-    retention_query = """
-    WITH user_activity AS (
-        SELECT DISTINCT 
-            ul.user_id,
-            DATE(ul.event_timestamp) as activity_date
-        FROM user_logs ul
+    clusters_df = df[['user_id', 'cluster']]
+    retention_df = (
+        pd.DataFrame({
+            'cluster': df['cluster'],
+            'd7_retained': df['user_id'].isin(d7_active_users)
+        })[eligible]
+        .groupby('cluster')['d7_retained']
+        .agg(total_users='count', d7_retained='sum')
+        .reset_index()
     )
-    SELECT 
-        tc.cluster,
-        COUNT(DISTINCT u.user_id) as total_users,
-        COUNT(DISTINCT CASE 
-            WHEN DATE(ua.activity_date) = DATE(u.signup_date, '+7 days')
-            THEN u.user_id 
-        END) as d7_retained
-    FROM users u
-    JOIN temp_clusters tc ON u.user_id = tc.user_id
-    LEFT JOIN user_activity ua ON u.user_id = ua.user_id
-    WHERE DATE(u.signup_date, '+7 days') <= DATE('now')
-    GROUP BY tc.cluster
-    """
-    
-    retention_df = pd.read_sql_query(retention_query, conn)
     
     segment_retention = []
-    for _, row in retention_df.iterrows():
-        retention_rate = (row['d7_retained'] / row['total_users'] * 100) if row['total_users'] > 0 else 0
+    for cluster_id, total_users, d7_retained in retention_df.itertuples(index=False, name=None):
+        retention_rate = (d7_retained / total_users * 100) if total_users > 0 else 0
         segment_retention.append({
-            'cluster_id': int(row['cluster']),
-            'total_users': int(row['total_users']),
-            'd7_retained': int(row['d7_retained']),
+            'cluster_id': cluster_id,
+            'total_users': total_users,
+            'd7_retained': d7_retained,
             'd7_retention_rate': round(retention_rate, 2)
         })
-        print(f"  Cluster {row['cluster']}: D7 retention = {retention_rate:.2f}%")
+        print(f"  Cluster {cluster_id}: D7 retention = {retention_rate:.2f}%")
     
     # Heterogeneous Treatment Effect (HTE) analysis
     print("\nAnalyzing heterogeneous treatment effects...")
     
-    hte_query = """
-    SELECT 
-        tc.cluster,
-        ab.group_name,
-        COUNT(*) as total_users,
-        SUM(ab.is_converted) as conversions
-    FROM ab_test_results ab
-    JOIN temp_clusters tc ON ab.user_id = tc.user_id
-    GROUP BY tc.cluster, ab.group_name
-    """
+    hte_df = (
+        context['ab'].merge(clusters_df, on='user_id')
+        .groupby(['cluster', 'group_name'])['is_converted']
+        .agg(total_users='count', conversions='sum')
+        .reset_index()
+    )
     
-    hte_df = pd.read_sql_query(hte_query, conn)
+    # One row per cluster with both groups side by side; clusters missing
+    # either group are dropped
+    piv = hte_df.pivot(
+        index='cluster', columns='group_name', values=['conversions', 'total_users']
+    ).reindex(
+        columns=pd.MultiIndex.from_product([['conversions', 'total_users'], ['A', 'B']])
+    ).dropna()
+    
+    conv_rate_a = piv['conversions']['A'] / piv['total_users']['A']
+    conv_rate_b = piv['conversions']['B'] / piv['total_users']['B']
+    with np.errstate(divide='ignore', invalid='ignore'):
+        lift = np.where(conv_rate_a > 0, (conv_rate_b - conv_rate_a) / conv_rate_a * 100, 0)
+    
+    # Significance of the treatment effect within each cluster
+    test = two_prop_ztest(
+        piv['conversions']['A'], piv['total_users']['A'],
+        piv['conversions']['B'], piv['total_users']['B']
+    )
     
     hte_analysis = []
-    for cluster_id in range(n_clusters):
-        cluster_data = hte_df[hte_df['cluster'] == cluster_id]
+    for cluster_id, rate_a, rate_b, cluster_lift, p_value in zip(
+        piv.index, conv_rate_a, conv_rate_b, lift, test['p']
+    ):
+        hte_analysis.append({
+            'cluster_id': int(cluster_id),
+            'control_conversion_rate': round(rate_a * 100, 2),
+            'treatment_conversion_rate': round(rate_b * 100, 2),
+            'lift_pct': round(float(cluster_lift), 2),
+            'p_value': round(float(p_value), 4),
+            'significant': bool(p_value < 0.05)
+        })
         
-        if len(cluster_data) == 2:
-            group_a = cluster_data[cluster_data['group_name'] == 'A'].iloc[0]
-            group_b = cluster_data[cluster_data['group_name'] == 'B'].iloc[0]
-            
-            conv_rate_a = group_a['conversions'] / group_a['total_users']
-            conv_rate_b = group_b['conversions'] / group_b['total_users']
-            lift = ((conv_rate_b - conv_rate_a) / conv_rate_a * 100) if conv_rate_a > 0 else 0
-            
-            hte_analysis.append({
-                'cluster_id': int(cluster_id),
-                'control_conversion_rate': round(conv_rate_a * 100, 2),
-                'treatment_conversion_rate': round(conv_rate_b * 100, 2),
-                'lift_pct': round(lift, 2)
-            })
-            
-            print(f"  Cluster {cluster_id}: Control={conv_rate_a*100:.2f}%, Treatment={conv_rate_b*100:.2f}%, Lift={lift:.2f}%")
-    
-    # Clean up temp table
-    conn.execute("DROP TABLE IF EXISTS temp_clusters")
-    conn.close()
+        print(f"  Cluster {cluster_id}: Control={rate_a*100:.2f}%, Treatment={rate_b*100:.2f}%, Lift={cluster_lift:.2f}%")
     
     # Compile results
     results = {
         'n_clusters': n_clusters,
         'total_users': len(df),
+        'silhouette_score': round(float(silhouette), 4),
         'elbow_analysis': elbow_data,
+        'elbow_approximate': True,
         'segment_statistics': segment_stats,
         'segment_retention': segment_retention,
         'heterogeneous_treatment_effects': hte_analysis,
@@ -241,16 +267,30 @@ def analyze_segments(
         'analysis_timestamp': datetime.now().isoformat()
     }
     
-    # Save results
-    import os
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    with open(output_path, 'w') as f:
-        json.dump(results, f, indent=2)
+    save_segment_results(results, output_path)
     
     print(f"\n[OK] Segment analysis complete. Results saved to {output_path}")
     
     return results
 
 
+def save_segment_results(results: Dict, output_path: str) -> None:
+    """
+    Write segmentation results as JSON, plus their Feather tables.
+    
+    Args:
+        results: Segmentation analysis results
+        output_path: Path to save analysis results
+    """
+    import os
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    with open(output_path, 'wb') as f:
+        f.write(orjson.dumps(results, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+    save_tables(output_path, {
+        section: results[section]
+        for section in ('segment_statistics', 'segment_retention', 'heterogeneous_treatment_effects')
+    }, results['analysis_timestamp'])
+
+
 if __name__ == "__main__":
     analyze_segments()
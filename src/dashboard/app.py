@@ -9,11 +9,19 @@
 """
 
 import streamlit as st
-import json
+import html
+import numpy as np
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
+import pyarrow.feather as feather
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
 from pathlib import Path
+from types import MappingProxyType
+
+try:
+    from orjson import loads as json_loads
+except ImportError:  # json.loads accepts the same bytes input
+    from json import loads as json_loads
 
 
 # Page configuration
@@ -24,29 +32,376 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Series with at least this many points are drawn with WebGL; below it the
+# SVG renderer is faster to first paint
+WEBGL_MIN_POINTS = 1000
+
+
+# Chart options passed to every st.plotly_chart call
+PLOTLY_CONFIG = {'staticPlot': False, 'responsive': True}
+
+
+@lru_cache(maxsize=None)
+def _use_dashboard_template():
+    """
+    Register the shared chart layout as the default Plotly template.
+    
+    Called by each figure builder before it creates a figure; Plotly is only
+    imported, and the template only registered, on the first call.
+    """
+    import plotly.graph_objects as go
+    import plotly.io as pio
+    
+    pio.templates['dashboard'] = go.layout.Template(layout=dict(
+        height=400,
+        margin=dict(l=40, r=20, t=60, b=40),
+        font=dict(size=12)
+    ))
+    pio.templates.default = 'plotly+dashboard'
+
+
+def _scatter_cls(n):
+    """Return the scatter trace class to use for a series of n points."""
+    import plotly.graph_objects as go
+    return go.Scattergl if n >= WEBGL_MIN_POINTS else go.Scatter
+
+
+def _render_mode(n):
+    """Return the Plotly Express render mode for a series of n points."""
+    return 'webgl' if n >= WEBGL_MIN_POINTS else 'svg'
+
+
+# Longer series are downsampled before plotting
+DOWNSAMPLE_MAX_POINTS = 2000
+
+
+def _downsample_lttb(x, y, n_out=DOWNSAMPLE_MAX_POINTS):
+    """
+    Pick the points of a series to plot with Largest-Triangle-Three-Buckets.
+    
+    The first and last points are always kept. Every bucket in between keeps
+    the point forming the largest triangle with the previously kept point and
+    the average of the next bucket. Non-numeric x values (e.g. day labels) are
+    treated as evenly spaced.
+    
+    Returns the sorted positions of the kept points.
+    """
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if n <= n_out or n_out < 3:
+        return np.arange(n)
+    
+    x = np.asarray(x)
+    x = x.astype(float) if np.issubdtype(x.dtype, np.number) else np.arange(n, dtype=float)
+    
+    # n_out - 2 buckets between the first and last points
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    edges = np.append(edges, n)
+    
+    keep = np.empty(n_out, dtype=int)
+    keep[0], keep[-1] = 0, n - 1
+    prev = 0
+    for i in range(n_out - 2):
+        start, end, next_end = edges[i], edges[i + 1], edges[i + 2]
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+        area = np.abs(
+            (x[prev] - avg_x) * (y[start:end] - y[prev])
+            - (x[prev] - x[start:end]) * (avg_y - y[prev])
+        )
+        prev = start + int(area.argmax())
+        keep[i + 1] = prev
+    return keep
+
+
+RESULT_PATHS = {
+    'retention': "data/analysis_results/retention_analysis.json",
+    'ab_test': "data/analysis_results/ab_test_analysis.json",
+    'segment': "data/analysis_results/segment_analysis.json"
+}
+
+# Results each page needs, so a page loads only its own files
+PAGE_DEPS = {
+    'overview': ('retention', 'ab_test', 'segment'),
+    'retention': ('retention',),
+    'ab_test': ('ab_test',),
+    'segment': ('segment',),
+    'insights': ()
+}
+
+# Tabular result sections the analyses also write as Feather files
+TABLE_SECTIONS = {
+    'retention': ('overall_retention',),
+    'segment': ('segment_statistics', 'segment_retention', 'heterogeneous_treatment_effects')
+}
+
+
+def _load_json_if_exists(path):
+    """Load a JSON results file, or return None if it does not exist."""
+    if not Path(path).exists():
+        return None
+    return json_loads(Path(path).read_bytes())
+
+
+def _load_tables(path, sections, analysis_timestamp):
+    """
+    Memory-map the Feather copies of an analysis' tabular sections.
+    
+    A copy is used only if it was written with the loaded JSON, i.e. it
+    records the same analysis_timestamp; stale or foreign copies are skipped
+    so the pages fall back to the JSON sections.
+    """
+    tables = {}
+    for section in sections:
+        table_path = Path(path).with_suffix(f'.{section}.feather')
+        if not table_path.exists():
+            continue
+        table = feather.read_table(table_path, memory_map=True)
+        written_for = (table.schema.metadata or {}).get(b'analysis_timestamp')
+        if written_for is not None and written_for.decode() == analysis_timestamp:
+            tables[section] = table.to_pandas()
+    return tables
+
+
+def _section_df(data, section):
+    """Return a tabular result section as a DataFrame, preferring its Feather copy."""
+    if section in data.get('_tables', {}):
+        return data['_tables'][section]
+    
+    rows = data[section]
+    if isinstance(rows, dict):
+        rows = [{'day': day, **values} for day, values in rows.items()]
+    return pd.DataFrame.from_records(rows)
+
+
+def _downcast(df, categories=()):
+    """
+    Shrink a page table's dtypes before it is plotted.
+    
+    Identifier columns become categoricals and integer columns are downcast to
+    the narrowest integer type, so Plotly serializes fewer bytes. Float columns
+    (rates, percentages, averages) stay float64, since float32 would show
+    rounding noise such as 93.58000183 in hovers and axes.
+    """
+    df = df.copy()
+    for col in df.columns:
+        if col in categories:
+            df[col] = df[col].astype('category')
+        elif pd.api.types.is_integer_dtype(df[col]):
+            df[col] = pd.to_numeric(df[col], downcast='integer')
+    return df
+
+
+def _build_frames(results):
+    """Attach the DataFrames the pages display to the loaded results."""
+    if 'retention' in results:
+        retention_data = results['retention']
+        
+        retention_data['_df'] = _section_df(retention_data, 'overall_retention').rename(columns={
+            'day': '일자',
+            'retention_rate': '리텐션율 (%)',
+            'retained_users': '리텐션 사용자',
+            'total_users': '총 사용자'
+        })[['일자', '리텐션율 (%)', '리텐션 사용자', '총 사용자']]
+        retention_data['_df'] = _downcast(retention_data['_df'])
+        
+        comparison_rows = [
+            (
+                day,
+                comp['reward']['retention_rate'],
+                comp['no_reward']['retention_rate'],
+                comp.get('statistical_test', {}).get('p_value', None)
+            )
+            for day, comp in retention_data['reward_comparison'].items()
+            if 'reward' in comp and 'no_reward' in comp
+        ]
+        retention_data['_comp_df'] = pd.DataFrame.from_records(
+            comparison_rows, columns=['일자', '보상 사용자 (%)', '비보상 사용자 (%)', 'P-value']
+        ).astype({'보상 사용자 (%)': 'float64', '비보상 사용자 (%)': 'float64', 'P-value': 'float64'})
+    
+    if 'segment' in results:
+        segment_data = results['segment']
+        segment_data['_stats_df'] = _downcast(
+            _section_df(segment_data, 'segment_statistics'), categories=('cluster_id',)
+        )
+        segment_data['_retention_df'] = _downcast(
+            _section_df(segment_data, 'segment_retention'), categories=('cluster_id',)
+        )
+        if segment_data.get('heterogeneous_treatment_effects'):
+            segment_data['_hte_df'] = _downcast(
+                _section_df(segment_data, 'heterogeneous_treatment_effects'), categories=('cluster_id',)
+            )
+
+
 # Load analysis results
-@st.cache_data
-def load_analysis_results():
-    """Load all analysis results from JSON files."""
-    results = {}
+@st.cache_resource(ttl=None)
+def load_analysis_results(keys=tuple(RESULT_PATHS)):
+    """
+    Load analysis results from JSON files, with Feather tables where available.
+    
+    The results are loaded once per process and shared by reference across
+    sessions and reruns, so pages must not mutate them.
+    
+    Args:
+        keys: Results to load ('retention', 'ab_test', 'segment')
+    """
+    if not keys:
+        return MappingProxyType({})
+    
+    # The files are read concurrently
+    with ThreadPoolExecutor(max_workers=len(keys)) as pool:
+        futures = {key: pool.submit(_load_json_if_exists, RESULT_PATHS[key]) for key in keys}
+        results = {key: future.result() for key, future in futures.items()}
+    results = {key: data for key, data in results.items() if data is not None}
+    
+    for key, sections in TABLE_SECTIONS.items():
+        if key in results:
+            results[key]['_tables'] = _load_tables(
+                RESULT_PATHS[key], sections, results[key].get('analysis_timestamp')
+            )
+    
+    # Page tables are built once here rather than on every rerun
+    _build_frames(results)
+    
+    return MappingProxyType(results)
+
+
+def _hash_df(df):
+    """Content hash of a DataFrame for the figure and table caches."""
+    return tuple(df.columns), pd.util.hash_pandas_object(df).values.tobytes()
+
+
+# Figures and HTML tables are cached on the content of their input tables so
+# revisiting a page replays them instead of rebuilding them
+_cache_by_content = st.cache_data(hash_funcs={pd.DataFrame: _hash_df})
+
+
+@_cache_by_content
+def _build_retention_curve(retention_df):
+    """Build the overall retention curve."""
+    import plotly.express as px
+    _use_dashboard_template()
     
-    retention_path = "data/analysis_results/retention_analysis.json"
-    ab_test_path = "data/analysis_results/ab_test_analysis.json"
-    segment_path = "data/analysis_results/segment_analysis.json"
+    if len(retention_df) > DOWNSAMPLE_MAX_POINTS:
+        retention_df = retention_df.iloc[
+            _downsample_lttb(retention_df['일자'], retention_df['리텐션율 (%)'])
+        ]
     
-    if Path(retention_path).exists():
-        with open(retention_path, 'r') as f:
-            results['retention'] = json.load(f)
+    fig = px.line(retention_df, x='일자', y='리텐션율 (%)',
+                  title='리텐션 커브',
+                  markers=True,
+                  render_mode=_render_mode(len(retention_df)))
+    return fig
+
+
+@_cache_by_content
+def _build_comparison_fig(comp_df):
+    """Build the reward vs non-reward retention comparison."""
+    import plotly.graph_objects as go
+    _use_dashboard_template()
+    
+    # Both series share one set of x positions so categorical days stay ordered
+    if len(comp_df) > DOWNSAMPLE_MAX_POINTS:
+        comp_df = comp_df.iloc[np.union1d(
+            _downsample_lttb(comp_df['일자'], comp_df['보상 사용자 (%)']),
+            _downsample_lttb(comp_df['일자'], comp_df['비보상 사용자 (%)'])
+        )]
+    
+    scatter = _scatter_cls(len(comp_df))
+    fig = go.Figure()
+    fig.add_trace(scatter(x=comp_df['일자'], y=comp_df['보상 사용자 (%)'],
+                          mode='lines+markers', name='보상 사용자'))
+    fig.add_trace(scatter(x=comp_df['일자'], y=comp_df['비보상 사용자 (%)'],
+                          mode='lines+markers', name='비보상 사용자'))
+    fig.update_layout(title='리텐션: 보상 vs 비보상 사용자',
+                     yaxis_title='리텐션율 (%)')
+    return fig
+
+
+@_cache_by_content
+def _build_conversion_fig(control_rate, treatment_rate):
+    """Build the A/B conversion rate comparison."""
+    import plotly.graph_objects as go
+    _use_dashboard_template()
     
-    if Path(ab_test_path).exists():
-        with open(ab_test_path, 'r') as f:
-            results['ab_test'] = json.load(f)
+    fig = go.Figure(data=[
+        go.Bar(name='Control (A)', x=['Conversion Rate'], 
+               y=[control_rate]),
+        go.Bar(name='Treatment (B)', x=['Conversion Rate'], 
+               y=[treatment_rate])
+    ])
+    fig.update_layout(title='전환율 비교', 
+                     yaxis_title='전환율 (%)')
+    return fig
+
+
+@_cache_by_content
+def _build_segment_pie(segment_stats):
+    """Build the user distribution across segments."""
+    import plotly.express as px
+    _use_dashboard_template()
+    return px.pie(segment_stats, values='size', names='cluster_id',
+                  title='세그먼트별 사용자 분포')
+
+
+@_cache_by_content
+def _build_segment_retention_fig(retention_df):
+    """Build the D7 retention per segment."""
+    import plotly.express as px
+    _use_dashboard_template()
     
-    if Path(segment_path).exists():
-        with open(segment_path, 'r') as f:
-            results['segment'] = json.load(f)
+    fig = px.bar(retention_df, x='cluster_id', y='d7_retention_rate',
+                 title='세그먼트별 D7 리텐션',
+                 labels={'cluster_id': '클러스터', 'd7_retention_rate': 'D7 리텐션 (%)'},
+                 text='d7_retention_rate')
+    fig.update_traces(texttemplate='%{text:.2f}%', textposition='outside')
+    return fig
+
+
+@_cache_by_content
+def _build_hte_fig(hte_df):
+    """Build the A/B test effect per segment."""
+    import plotly.graph_objects as go
+    _use_dashboard_template()
+    
+    # Bars for a handful of segments, WebGL markers for many
+    if len(hte_df) >= WEBGL_MIN_POINTS:
+        trace = partial(go.Scattergl, mode='markers')
+    else:
+        trace = go.Bar
     
-    return results
+    fig = go.Figure()
+    fig.add_trace(trace(name='Control', x=hte_df['cluster_id'], 
+                        y=hte_df['control_conversion_rate']))
+    fig.add_trace(trace(name='Treatment', x=hte_df['cluster_id'], 
+                        y=hte_df['treatment_conversion_rate']))
+    fig.update_layout(title='세그먼트별 A/B 테스트 효과',
+                     xaxis_title='클러스터',
+                     yaxis_title='전환율 (%)')
+    return fig
+
+
+@_cache_by_content
+def _html_table(df):
+    """
+    Render a small, static table as an HTML string in a single pass.
+    
+    Used instead of st.dataframe for analysis tables that need no sorting or
+    filtering, which skips the Arrow round-trip to the frontend grid.
+    """
+    def cell(value):
+        if pd.isna(value):
+            return '<td></td>'
+        return f'<td>{html.escape(str(value))}</td>'
+    
+    # Rows are zipped from the column arrays so values keep their NumPy types
+    # (float32 values print at their own precision)
+    header = ''.join(f'<th>{html.escape(str(col))}</th>' for col in df.columns)
+    rows = ''.join(
+        '<tr>' + ''.join(cell(value) for value in row) + '</tr>'
+        for row in zip(*(df[col].to_numpy() for col in df.columns))
+    )
+    return f'<table><thead><tr>{header}</tr></thead><tbody>{rows}</tbody></table>'
 
 
 def show_overview(results):
@@ -122,55 +477,25 @@ def show_retention_analysis(results):
     # Overall Retention Metrics
     st.markdown("### 전체 리텐션 지표")
     
-    retention_df = pd.DataFrame([
-        {
-            '일자': day,
-            '리텐션율 (%)': metrics['retention_rate'],
-            '리텐션 사용자': metrics['retained_users'],
-            '총 사용자': metrics['total_users']
-        }
-        for day, metrics in retention_data['overall_retention'].items()
-    ])
+    retention_df = retention_data['_df']
     
     # Retention curve
-    fig = px.line(retention_df, x='일자', y='리텐션율 (%)',
-                  title='리텐션 커브',
-                  markers=True)
-    fig.update_layout(height=400)
-    st.plotly_chart(fig, use_container_width=True)
+    st.plotly_chart(_build_retention_curve(retention_df), use_container_width=True, config=PLOTLY_CONFIG)
     
     # Retention table
-    st.dataframe(retention_df, use_container_width=True)
+    st.markdown(_html_table(retention_df), unsafe_allow_html=True)
     
     # Reward vs Non-Reward Comparison
     st.markdown("### 보상 vs 비보상 사용자")
     
-    comparison_data = []
-    for day, comp in retention_data['reward_comparison'].items():
-        if 'reward' in comp and 'no_reward' in comp:
-            comparison_data.append({
-                '일자': day,
-                '보상 사용자 (%)': comp['reward']['retention_rate'],
-                '비보상 사용자 (%)': comp['no_reward']['retention_rate'],
-                'P-value': comp.get('statistical_test', {}).get('p_value', None)
-            })
-    
-    comp_df = pd.DataFrame(comparison_data)
+    comp_df = retention_data['_comp_df']
     
     # Comparison chart
-    fig = go.Figure()
-    fig.add_trace(go.Scatter(x=comp_df['일자'], y=comp_df['보상 사용자 (%)'],
-                            mode='lines+markers', name='보상 사용자'))
-    fig.add_trace(go.Scatter(x=comp_df['일자'], y=comp_df['비보상 사용자 (%)'],
-                            mode='lines+markers', name='비보상 사용자'))
-    fig.update_layout(title='리텐션: 보상 vs 비보상 사용자',
-                     yaxis_title='리텐션율 (%)',
-                     height=400)
-    st.plotly_chart(fig, use_container_width=True)
+    st.plotly_chart(_build_comparison_fig(comp_df), use_container_width=True, config=PLOTLY_CONFIG)
     
     # Statistical significance
     st.markdown("**통계적 유의성:**")
-    st.dataframe(comp_df, use_container_width=True)
+    st.markdown(_html_table(comp_df), unsafe_allow_html=True)
     
     st.info("💡 **인사이트:** 보상을 획듍한 사용자는 모든 기간에서 현저히 높은 리텐션을 보입니다 (p < 0.0001)")
 
@@ -206,16 +531,9 @@ def show_ab_test_results(results):
                  f"{ab_data['effect_size']['absolute_lift_pct']}pp 절대값")
     
     # Conversion comparison chart
-    fig = go.Figure(data=[
-        go.Bar(name='Control (A)', x=['Conversion Rate'], 
-               y=[ab_data['group_a']['conversion_rate_pct']]),
-        go.Bar(name='Treatment (B)', x=['Conversion Rate'], 
-               y=[ab_data['group_b']['conversion_rate_pct']])
-    ])
-    fig.update_layout(title='전환율 비교', 
-                     yaxis_title='전환율 (%)',
-                     height=400)
-    st.plotly_chart(fig, use_container_width=True)
+    fig = _build_conversion_fig(ab_data['group_a']['conversion_rate_pct'],
+                                ab_data['group_b']['conversion_rate_pct'])
+    st.plotly_chart(fig, use_container_width=True, config=PLOTLY_CONFIG)
     
     # Statistical Tests
     st.markdown("### 통계 검정 결과")
@@ -225,16 +543,20 @@ def show_ab_test_results(results):
     with col1:
         st.markdown("**Two-Proportion Z-검정:**")
         z_test = ab_data['statistical_tests']['z_test']
-        st.write(f"- Z-점수: {z_test['z_score']}")
-        st.write(f"- P-value: {z_test['p_value']}")
-        st.write(f"- 유의함: {'✅ 예' if z_test['significant'] else '❌ 아니오'}")
+        st.markdown(
+            f"- Z-점수: {z_test['z_score']}\n"
+            f"- P-value: {z_test['p_value']}\n"
+            f"- 유의함: {'✅ 예' if z_test['significant'] else '❌ 아니오'}"
+        )
     
     with col2:
         st.markdown("**카이제곱 검정:**")
         chi_test = ab_data['statistical_tests']['chi_square_test']
-        st.write(f"- 카이제곱: {chi_test['chi_square']}")
-        st.write(f"- P-value: {chi_test['p_value']}")
-        st.write(f"- 유의함: {'✅ 예' if chi_test['significant'] else '❌ 아니오'}")
+        st.markdown(
+            f"- 카이제곱: {chi_test['chi_square']}\n"
+            f"- P-value: {chi_test['p_value']}\n"
+            f"- 유의함: {'✅ 예' if chi_test['significant'] else '❌ 아니오'}"
+        )
     
     # Effect Size and Confidence Interval
     st.markdown("### 효과 크기 & 신뢰구간")
@@ -281,12 +603,10 @@ def show_segment_analysis(results):
     # Segment Distribution
     st.markdown("### 세그먼트 분포")
     
-    segment_stats = pd.DataFrame(segment_data['segment_statistics'])
+    segment_stats = segment_data['_stats_df']
     
     # Pie chart
-    fig = px.pie(segment_stats, values='size', names='cluster_id',
-                 title='세그먼트별 사용자 분포')
-    st.plotly_chart(fig, use_container_width=True)
+    st.plotly_chart(_build_segment_pie(segment_stats), use_container_width=True, config=PLOTLY_CONFIG)
     
     # Segment Characteristics
     st.markdown("### 세그먼트 특성")
@@ -296,39 +616,24 @@ def show_segment_analysis(results):
                                  'avg_daily_events']]
     display_df.columns = ['클러스터', '사용자 수', '%', '평균 이벤트', 
                           '평균 보상', '일일 평균 이벤트']
-    st.dataframe(display_df, use_container_width=True)
+    st.markdown(_html_table(display_df), unsafe_allow_html=True)
     
     # Segment Retention
     st.markdown("### 세그먼트별 D7 리텐션")
     
-    retention_df = pd.DataFrame(segment_data['segment_retention'])
+    retention_df = segment_data['_retention_df']
     
-    fig = px.bar(retention_df, x='cluster_id', y='d7_retention_rate',
-                 title='세그먼트별 D7 리텐션',
-                 labels={'cluster_id': '클러스터', 'd7_retention_rate': 'D7 리텐션 (%)'},
-                 text='d7_retention_rate')
-    fig.update_traces(texttemplate='%{text:.2f}%', textposition='outside')
-    fig.update_layout(height=400)
-    st.plotly_chart(fig, use_container_width=True)
+    st.plotly_chart(_build_segment_retention_fig(retention_df), use_container_width=True, config=PLOTLY_CONFIG)
     
     # Heterogeneous Treatment Effects
     if segment_data.get('heterogeneous_treatment_effects'):
         st.markdown("### 이질적 처치 효과 (HTE)")
         
-        hte_df = pd.DataFrame(segment_data['heterogeneous_treatment_effects'])
+        hte_df = segment_data['_hte_df']
         
-        fig = go.Figure()
-        fig.add_trace(go.Bar(name='Control', x=hte_df['cluster_id'], 
-                            y=hte_df['control_conversion_rate']))
-        fig.add_trace(go.Bar(name='Treatment', x=hte_df['cluster_id'], 
-                            y=hte_df['treatment_conversion_rate']))
-        fig.update_layout(title='세그먼트별 A/B 테스트 효과',
-                         xaxis_title='클러스터',
-                         yaxis_title='전환율 (%)',
-                         height=400)
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(_build_hte_fig(hte_df), use_container_width=True, config=PLOTLY_CONFIG)
         
-        st.dataframe(hte_df, use_container_width=True)
+        st.markdown(_html_table(hte_df), unsafe_allow_html=True)
         
         st.info("💡 **인사이트:** 처치 효과는 세그먼트별로 다릅니다. 클러스터 0 (저참여 사용자)이 처치에 가장 강한 긍정적 반응을 보입니다.")
 
@@ -391,6 +696,24 @@ def show_insights(results):
     """)
 
 
+# Navigation: page id -> sidebar label and page renderer
+PAGE_LABELS = {
+    'overview': "개요",
+    'retention': "리텐션 분석",
+    'ab_test': "A/B 테스트 결과",
+    'segment': "사용자 세그먼테이션",
+    'insights': "인사이트 & 액션"
+}
+
+PAGES = {
+    'overview': show_overview,
+    'retention': show_retention_analysis,
+    'ab_test': show_ab_test_results,
+    'segment': show_segment_analysis,
+    'insights': show_insights
+}
+
+
 # Main app
 def main():
     """Main dashboard application."""
@@ -399,30 +722,21 @@ def main():
     st.sidebar.title("내비게이션")
     page = st.sidebar.radio(
         "페이지 선택",
-        ["개요", "리텐션 분석", "A/B 테스트 결과", 
-         "사용자 세그먼테이션", "인사이트 & 액션"]
+        list(PAGES),
+        format_func=PAGE_LABELS.get
     )
     
     # Load data
     try:
-        results = load_analysis_results()
+        results = load_analysis_results(PAGE_DEPS[page])
         
-        if not results:
+        if PAGE_DEPS[page] and not results:
             st.error("분석 결과를 찾을 수 없습니다. 먼저 분석 파이프라인을 실행해주세요:")
             st.code("python src/analysis/run_all_analysis.py")
             return
         
         # Display selected page
-        if page == "개요":
-            show_overview(results)
-        elif page == "리텐션 분석":
-            show_retention_analysis(results)
-        elif page == "A/B 테스트 결과":
-            show_ab_test_results(results)
-        elif page == "사용자 세그먼테이션":
-            show_segment_analysis(results)
-        elif page == "인사이트 & 액션":
-            show_insights(results)
+        PAGES[page](results)
     
     except Exception as e:
         st.error(f"결과 로딩 오류: {str(e)}")
@@ -5,34 +5,57 @@ This script creates a standalone HTML file with all visualizations
 that can be deployed to GitHub Pages.
 """
 
-import json
-import plotly.graph_objects as go
+import gzip
+import hashlib
+from functools import partial
 from plotly.subplots import make_subplots
 import pandas as pd
 from pathlib import Path
 
+try:
+    from orjson import loads as json_loads
+except ImportError:  # The Pages workflow only installs plotly and pandas
+    from pandas.io.json import ujson_loads
+    # Without precise_float, ujson misreads values such as 2.78 as 2.7800000000000002
+    json_loads = partial(ujson_loads, precise_float=True)
+
+
+RESULT_PATHS = {
+    'retention': "data/analysis_results/retention_analysis.json",
+    'ab_test': "data/analysis_results/ab_test_analysis.json",
+    'segment': "data/analysis_results/segment_analysis.json"
+}
+
+OUTPUT_PATH = "docs/index.html"
+CACHE_KEY_PATH = "docs/.cache_key"
+
 
 def load_analysis_results():
     """Load all analysis results from JSON files."""
     results = {}
     
-    retention_path = "data/analysis_results/retention_analysis.json"
-    ab_test_path = "data/analysis_results/ab_test_analysis.json"
-    segment_path = "data/analysis_results/segment_analysis.json"
+    for key, path in RESULT_PATHS.items():
+        if Path(path).exists():
+            results[key] = json_loads(Path(path).read_bytes())
     
-    if Path(retention_path).exists():
-        with open(retention_path, 'r', encoding='utf-8') as f:
-            results['retention'] = json.load(f)
-    
-    if Path(ab_test_path).exists():
-        with open(ab_test_path, 'r', encoding='utf-8') as f:
-            results['ab_test'] = json.load(f)
+    return results
+
+
+def dashboard_cache_key():
+    """
+    Hash the inputs of the static dashboard.
     
-    if Path(segment_path).exists():
-        with open(segment_path, 'r', encoding='utf-8') as f:
-            results['segment'] = json.load(f)
+    Covers the analysis result files and this script, so the key changes
+    whenever either the data or the page template does.
     
-    return results
+    Returns:
+        BLAKE2b hex digest
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for path in [*RESULT_PATHS.values(), __file__]:
+        if Path(path).exists():
+            digest.update(Path(path).read_bytes())
+    return digest.hexdigest()
 
 
 def create_static_dashboard():
@@ -44,6 +67,13 @@ def create_static_dashboard():
         print("[WARNING] 분석 결과를 찾을 수 없습니다. 먼저 분석을 실행하세요.")
         return
     
+    # Skip rendering when neither the results nor this script have changed
+    cache_key = dashboard_cache_key()
+    if (Path(OUTPUT_PATH).exists() and Path(CACHE_KEY_PATH).exists()
+            and Path(CACHE_KEY_PATH).read_text() == cache_key):
+        print(f"[OK] 분석 결과가 변경되지 않아 기존 대시보드를 유지합니다: {OUTPUT_PATH}")
+        return
+    
     # Create figure with subplots
     fig = make_subplots(
         rows=3, cols=2,
@@ -68,8 +98,8 @@ def create_static_dashboard():
         rates = [retention_data[day]['retention_rate'] for day in days]
         
         fig.add_trace(
-            go.Scatter(x=days, y=rates, mode='lines+markers', name='전체 리텐션',
-                      line=dict(color='#FF4B4B', width=3)),
+            dict(type='scatter', x=days, y=rates, mode='lines+markers', name='전체 리텐션',
+                 line=dict(color='#FF4B4B', width=3)),
             row=1, col=1
         )
         
@@ -80,13 +110,13 @@ def create_static_dashboard():
         no_reward_rates = [reward_comp[day].get('no_reward', {}).get('retention_rate', 0) for day in days]
         
         fig.add_trace(
-            go.Scatter(x=days, y=reward_rates, mode='lines+markers', name='보상 유저',
-                      line=dict(color='#00CC96', width=2)),
+            dict(type='scatter', x=days, y=reward_rates, mode='lines+markers', name='보상 유저',
+                 line=dict(color='#00CC96', width=2)),
             row=1, col=2
         )
         fig.add_trace(
-            go.Scatter(x=days, y=no_reward_rates, mode='lines+markers', name='비보상 유저',
-                      line=dict(color='#AB63FA', width=2)),
+            dict(type='scatter', x=days, y=no_reward_rates, mode='lines+markers', name='비보상 유저',
+                 line=dict(color='#AB63FA', width=2)),
             row=1, col=2
         )
     
@@ -94,14 +124,14 @@ def create_static_dashboard():
     if 'ab_test' in results:
         ab_data = results['ab_test']
         fig.add_trace(
-            go.Bar(x=['대조군 (A)', '실험군 (B)'],
-                  y=[ab_data['group_a']['conversion_rate_pct'],
-                     ab_data['group_b']['conversion_rate_pct']],
-                  name='전환율',
-                  marker_color=['#636EFA', '#EF553B'],
-                  text=[f"{ab_data['group_a']['conversion_rate_pct']}%",
-                        f"{ab_data['group_b']['conversion_rate_pct']}%"],
-                  textposition='outside'),
+            dict(type='bar', x=['대조군 (A)', '실험군 (B)'],
+                 y=[ab_data['group_a']['conversion_rate_pct'],
+                    ab_data['group_b']['conversion_rate_pct']],
+                 name='전환율',
+                 marker=dict(color=['#636EFA', '#EF553B']),
+                 text=[f"{ab_data['group_a']['conversion_rate_pct']}%",
+                       f"{ab_data['group_b']['conversion_rate_pct']}%"],
+                 textposition='outside'),
             row=2, col=1
         )
     
@@ -112,10 +142,10 @@ def create_static_dashboard():
         d7_rates = [s['d7_retention_rate'] for s in segment_retention]
         
         fig.add_trace(
-            go.Bar(x=clusters, y=d7_rates, name='D7 리텐션',
-                  marker_color='#FFA15A',
-                  text=[f"{rate:.1f}%" for rate in d7_rates],
-                  textposition='outside'),
+            dict(type='bar', x=clusters, y=d7_rates, name='D7 리텐션',
+                 marker=dict(color='#FFA15A'),
+                 text=[f"{rate:.1f}%" for rate in d7_rates],
+                 textposition='outside'),
             row=2, col=2
         )
         
@@ -125,8 +155,8 @@ def create_static_dashboard():
         values = [s['size'] for s in segment_stats]
         
         fig.add_trace(
-            go.Pie(labels=labels, values=values, name='세그먼트',
-                  marker_colors=['#636EFA', '#EF553B', '#00CC96']),
+            dict(type='pie', labels=labels, values=values, name='세그먼트',
+                 marker=dict(colors=['#636EFA', '#EF553B', '#00CC96'])),
             row=3, col=1
         )
         
@@ -138,13 +168,13 @@ def create_static_dashboard():
             treatment = [h['treatment_conversion_rate'] for h in hte_data]
             
             fig.add_trace(
-                go.Bar(x=clusters, y=control, name='대조군',
-                      marker_color='#636EFA'),
+                dict(type='bar', x=clusters, y=control, name='대조군',
+                     marker=dict(color='#636EFA')),
                 row=3, col=2
             )
             fig.add_trace(
-                go.Bar(x=clusters, y=treatment, name='실험군',
-                      marker_color='#EF553B'),
+                dict(type='bar', x=clusters, y=treatment, name='실험군',
+                     marker=dict(color='#EF553B')),
                 row=3, col=2
             )
     
@@ -168,8 +198,8 @@ def create_static_dashboard():
     fig.update_xaxes(title_text="클러스터", row=3, col=2)
     fig.update_yaxes(title_text="전환율 (%)", row=3, col=2)
     
-    # Create HTML with custom styling
-    html_content = f"""
+    # Create HTML with custom styling; the chart is streamed in between
+    html_header = f"""
 <!DOCTYPE html>
 <html lang="ko">
 <head>
@@ -270,7 +300,9 @@ def create_static_dashboard():
         </div>
         
         <div class="chart-container">
-            {fig.to_html(include_plotlyjs='cdn', div_id='dashboard')}
+"""
+    
+    html_footer = f"""
         </div>
         
         <div class="footer">
@@ -287,14 +319,25 @@ def create_static_dashboard():
 """
     
     # Save HTML file
-    output_path = "docs/index.html"
-    Path("docs").mkdir(exist_ok=True)
+    output_path = OUTPUT_PATH
+    Path(output_path).parent.mkdir(exist_ok=True)
     
     with open(output_path, 'w', encoding='utf-8') as f:
-        f.write(html_content)
+        f.write(html_header)
+        # The figure was validated as it was built, so skip re-validating on export
+        fig.write_html(
+            f, include_plotlyjs='cdn', full_html=False, div_id='dashboard',
+            include_mathjax=False, config={'displayModeBar': False}, validate=False
+        )
+        f.write(html_footer)
+    
+    # Pre-compressed copy; mtime=0 keeps the archive identical for identical HTML
+    html_bytes = Path(output_path).read_bytes()
+    Path(output_path + '.gz').write_bytes(gzip.compress(html_bytes, mtime=0))
+    Path(CACHE_KEY_PATH).write_text(cache_key)
     
     print(f"[OK] 정적 대시보드 생성 완료: {output_path}")
-    print(f"[INFO] 파일 크기: {len(html_content) / 1024:.1f} KB")
+    print(f"[INFO] 파일 크기: {len(html_bytes) / 1024:.1f} KB (gzip: {Path(output_path + '.gz').stat().st_size / 1024:.1f} KB)")
     print(f"\n로컬에서 확인: file:///{Path(output_path).absolute()}")
 
 
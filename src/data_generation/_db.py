@@ -0,0 +1,78 @@
+"""
+Shared database helpers for the data generation modules.
+
+The generators bulk-load freshly generated rows, so their connections trade
+durability for insert throughput: a crash mid-generation only means the
+pipeline has to be re-run.
+"""
+
+import sqlite3
+from itertools import chain, islice
+from typing import Iterable, Sequence, Tuple
+
+
+# Lowest host-parameter limit across SQLite versions (raised to 32766 in 3.32)
+SQLITE_MAX_VARIABLES = 999
+
+
+def connect_for_load(db_path: str = "data/app_data.db") -> sqlite3.Connection:
+    """
+    Open the SQLite database tuned for bulk inserts.
+    
+    WAL journaling with synchronous writes turned off avoids an fsync per
+    commit, and temp data and a large page cache are kept in memory. Callers
+    insert everything in a single transaction and commit once at the end.
+    
+    Args:
+        db_path: Path to the SQLite database
+    
+    Returns:
+        SQLite connection
+    """
+    conn = sqlite3.connect(db_path)
+    conn.executescript("""
+        PRAGMA journal_mode = WAL;
+        PRAGMA synchronous = OFF;
+        PRAGMA temp_store = MEMORY;
+        PRAGMA cache_size = -200000;
+    """)
+    return conn
+
+
+def insert_rows(
+    cursor: sqlite3.Cursor,
+    table: str,
+    columns: Sequence[str],
+    rows: Iterable[Tuple]
+) -> int:
+    """
+    Insert rows with multi-row INSERT statements.
+    
+    Each statement carries as many rows as fit in SQLITE_MAX_VARIABLES bound
+    parameters, which cuts the per-statement overhead of a row-by-row
+    executemany roughly in half. Rows are consumed lazily, so a generator can
+    be streamed in.
+    
+    Args:
+        cursor: Cursor to insert through
+        table: Name of the table to insert into
+        columns: Names of the inserted columns
+        rows: Row tuples in column order
+    
+    Returns:
+        Number of inserted rows
+    """
+    rows_per_statement = SQLITE_MAX_VARIABLES // len(columns)
+    row_placeholders = f"({', '.join('?' * len(columns))})"
+    insert_sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES "
+    batch_sql = insert_sql + ', '.join([row_placeholders] * rows_per_statement)
+    
+    rows = iter(rows)
+    inserted = 0
+    while batch := list(islice(rows, rows_per_statement)):
+        if len(batch) < rows_per_statement:
+            # Last partial batch
+            batch_sql = insert_sql + ', '.join([row_placeholders] * len(batch))
+        cursor.execute(batch_sql, list(chain.from_iterable(batch)))
+        inserted += len(batch)
+    return inserted
@@ -10,20 +10,27 @@ This module creates the SQLite database and defines the schema for:
 import sqlite3
 import os
 from pathlib import Path
+from typing import Optional
 
 
-def create_database(db_path: str = "data/app_data.db") -> None:
+def create_database(
+    db_path: str = "data/app_data.db",
+    conn: Optional[sqlite3.Connection] = None
+) -> None:
     """
     Create SQLite database with required tables.
     
     Args:
         db_path: Path to the SQLite database file
+        conn: Open connection to reuse and leave open (opened from db_path if omitted)
     """
     # Ensure data directory exists
     Path(db_path).parent.mkdir(parents=True, exist_ok=True)
     
     # Connect to database (creates if doesn't exist)
-    conn = sqlite3.connect(db_path)
+    owns_conn = conn is None
+    if owns_conn:
+        conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
     
     # Create users table
@@ -39,10 +46,10 @@ def create_database(db_path: str = "data/app_data.db") -> None:
     # Create user_logs table
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS user_logs (
-            log_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            log_id INTEGER PRIMARY KEY,
             user_id INTEGER NOT NULL,
             event_name TEXT NOT NULL,
-            event_timestamp TEXT NOT NULL,
+            event_timestamp INTEGER NOT NULL,
             value REAL,
             FOREIGN KEY (user_id) REFERENCES users(user_id)
         )
@@ -54,11 +61,39 @@ def create_database(db_path: str = "data/app_data.db") -> None:
             user_id INTEGER PRIMARY KEY,
             group_name TEXT NOT NULL,
             is_converted INTEGER NOT NULL,
-            conversion_timestamp TEXT,
+            conversion_timestamp INTEGER,
             FOREIGN KEY (user_id) REFERENCES users(user_id)
         )
     """)
     
+    # Commit changes and close connection
+    conn.commit()
+    if owns_conn:
+        conn.close()
+    
+    print(f"[OK] Database created successfully at: {db_path}")
+    print("[OK] Tables created: users, user_logs, ab_test_results")
+
+
+def create_indexes(
+    db_path: str = "data/app_data.db",
+    conn: Optional[sqlite3.Connection] = None
+) -> None:
+    """
+    Create the indexes used by the analysis queries.
+    
+    Runs after the bulk load, so the B-trees are built once from the loaded
+    rows instead of being updated on every insert.
+    
+    Args:
+        db_path: Path to the SQLite database file
+        conn: Open connection to reuse and leave open (opened from db_path if omitted)
+    """
+    owns_conn = conn is None
+    if owns_conn:
+        conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    
     # Create indexes for better query performance
     cursor.execute("""
         CREATE INDEX IF NOT EXISTS idx_user_logs_user_id 
@@ -80,14 +115,13 @@ def create_database(db_path: str = "data/app_data.db") -> None:
         ON ab_test_results(group_name)
     """)
     
-    # Commit changes and close connection
     conn.commit()
-    conn.close()
+    if owns_conn:
+        conn.close()
     
-    print(f"[OK] Database created successfully at: {db_path}")
-    print("[OK] Tables created: users, user_logs, ab_test_results")
     print("[OK] Indexes created for optimized queries")
 
 
 if __name__ == "__main__":
     create_database()
+    create_indexes()
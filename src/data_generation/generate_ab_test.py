@@ -5,16 +5,24 @@ This module assigns users to A/B test groups and generates conversion data
 with realistic conversion rates showing treatment effect.
 """
 
+import sys
 import sqlite3
-import random
-from datetime import datetime, timedelta
-from typing import List, Tuple
+from pathlib import Path
+from typing import Optional, Union
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from data_generation._db import connect_for_load
 
 
 def generate_ab_test(
     db_path: str = "data/app_data.db",
     control_conversion_rate: float = 0.175,
-    treatment_lift: float = 0.12
+    treatment_lift: float = 0.12,
+    conn: Optional[sqlite3.Connection] = None,
+    seed: Optional[Union[int, np.random.SeedSequence]] = None
 ) -> None:
     """
     Generate A/B test data with group assignment and conversions.
@@ -23,8 +31,12 @@ def generate_ab_test(
         db_path: Path to the SQLite database
         control_conversion_rate: Baseline conversion rate for control group (A)
         treatment_lift: Relative lift for treatment group (B) - e.g., 0.12 = 12% increase
+        conn: Open connection to reuse and leave open (opened from db_path if omitted)
+        seed: Seed for the random number generator (fresh entropy if omitted)
     """
-    conn = sqlite3.connect(db_path)
+    owns_conn = conn is None
+    if owns_conn:
+        conn = connect_for_load(db_path)
     cursor = conn.cursor()
     
     # Fetch all users
@@ -36,75 +48,48 @@ def generate_ab_test(
     # Calculate treatment conversion rate
     treatment_conversion_rate = control_conversion_rate * (1 + treatment_lift)
     
-    ab_test_data: List[Tuple] = []
+    rng = np.random.default_rng(seed)
+    num_users = len(users)
     
     # Randomly assign users to groups (50:50 split)
-    random.shuffle(users)
-    midpoint = len(users) // 2
-    
-    control_group = users[:midpoint]
-    treatment_group = users[midpoint:]
-    
-    control_conversions = 0
-    treatment_conversions = 0
+    order = rng.permutation(num_users)
+    user_ids = np.array([user[0] for user in users])[order]
+    signup_dates = pd.to_datetime([user[1] for user in users], format='%Y-%m-%d')[order]
+    midpoint = num_users // 2
     
-    # Process control group (A)
-    for user_id, signup_date_str in control_group:
-        is_converted = 1 if random.random() < control_conversion_rate else 0
-        
-        if is_converted:
-            control_conversions += 1
-            # Generate conversion timestamp (within 7 days of signup)
-            signup_date = datetime.strptime(signup_date_str, '%Y-%m-%d')
-            days_to_conversion = random.randint(0, 7)
-            conversion_time = signup_date + timedelta(
-                days=days_to_conversion,
-                hours=random.randint(0, 23),
-                minutes=random.randint(0, 59)
-            )
-            conversion_timestamp = conversion_time.isoformat()
-        else:
-            conversion_timestamp = None
-        
-        ab_test_data.append((user_id, 'A', is_converted, conversion_timestamp))
+    groups = np.where(np.arange(num_users) < midpoint, 'A', 'B')
+    rates = np.where(groups == 'A', control_conversion_rate, treatment_conversion_rate)
+    converted = rng.random(num_users) < rates
     
-    # Process treatment group (B)
-    for user_id, signup_date_str in treatment_group:
-        is_converted = 1 if random.random() < treatment_conversion_rate else 0
-        
-        if is_converted:
-            treatment_conversions += 1
-            # Generate conversion timestamp (within 7 days of signup)
-            signup_date = datetime.strptime(signup_date_str, '%Y-%m-%d')
-            days_to_conversion = random.randint(0, 7)
-            conversion_time = signup_date + timedelta(
-                days=days_to_conversion,
-                hours=random.randint(0, 23),
-                minutes=random.randint(0, 59)
-            )
-            conversion_timestamp = conversion_time.isoformat()
-        else:
-            conversion_timestamp = None
-        
-        ab_test_data.append((user_id, 'B', is_converted, conversion_timestamp))
+    # Generate conversion timestamps (within 7 days of signup, minute resolution),
+    # stored as Unix epoch seconds
+    minutes_to_conversion = rng.integers(0, 8 * 24 * 60, converted.sum())
+    conversion_times = signup_dates[converted] + pd.to_timedelta(minutes_to_conversion, unit='min')
+    conversion_timestamps = np.full(num_users, None, dtype=object)
+    conversion_timestamps[converted] = conversion_times.values.astype('datetime64[s]').astype(np.int64).tolist()
     
     # Insert A/B test data into database
     cursor.executemany(
         "INSERT INTO ab_test_results (user_id, group_name, is_converted, conversion_timestamp) VALUES (?, ?, ?, ?)",
-        ab_test_data
+        zip(user_ids.tolist(), groups.tolist(), converted.astype(int).tolist(), conversion_timestamps.tolist())
     )
     
     conn.commit()
-    conn.close()
+    if owns_conn:
+        conn.close()
     
     # Calculate actual rates
-    actual_control_rate = control_conversions / len(control_group)
-    actual_treatment_rate = treatment_conversions / len(treatment_group)
+    control_size = midpoint
+    treatment_size = num_users - midpoint
+    control_conversions = int(converted[:midpoint].sum())
+    treatment_conversions = int(converted[midpoint:].sum())
+    actual_control_rate = control_conversions / control_size
+    actual_treatment_rate = treatment_conversions / treatment_size
     actual_lift = (actual_treatment_rate - actual_control_rate) / actual_control_rate
     
     print(f"[OK] Successfully generated A/B test data")
-    print(f"  Control group (A): {len(control_group)} users, {control_conversions} conversions ({actual_control_rate:.2%})")
-    print(f"  Treatment group (B): {len(treatment_group)} users, {treatment_conversions} conversions ({actual_treatment_rate:.2%})")
+    print(f"  Control group (A): {control_size} users, {control_conversions} conversions ({actual_control_rate:.2%})")
+    print(f"  Treatment group (B): {treatment_size} users, {treatment_conversions} conversions ({actual_treatment_rate:.2%})")
     print(f"  Actual lift: {actual_lift:.2%}")
     print(f"  Expected lift: {treatment_lift:.2%}")
 
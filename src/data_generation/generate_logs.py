@@ -8,16 +8,163 @@ This module generates realistic user behavior logs including:
 - app_close: App close events
 """
 
+import sys
 import sqlite3
-import random
-from datetime import datetime, timedelta
-from typing import List, Tuple, Dict
+from pathlib import Path
+from datetime import datetime
+from multiprocessing import Pool
+from typing import Iterator, List, Optional, Tuple, Union
 import numpy as np
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from data_generation._db import connect_for_load, insert_rows
+
+
+# Event types; events are sampled as int8 indices into this list
+EVENT_TYPES = ['app_open', 'reward_earned', 'activity_completed', 'app_close']
+REWARD_EVENT = EVENT_TYPES.index('reward_earned')
+NON_REWARD_EVENTS = [i for i in range(len(EVENT_TYPES)) if i != REWARD_EVENT]
+
+# Normal event distribution
+EVENT_WEIGHTS = [0.3, 0.1, 0.4, 0.2]  # app_open, reward, activity, app_close
+
+# User behavior patterns based on segment
+BEHAVIOR_PATTERNS = {
+    'high_potential': {'daily_events': (5, 10), 'reward_prob': 0.7},
+    'medium_potential': {'daily_events': (2, 5), 'reward_prob': 0.4},
+    'low_potential': {'daily_events': (0, 2), 'reward_prob': 0.2}
+}
+
+# Logs are sampled for this many users at a time
+USERS_PER_BATCH = 1000
+
+# Below this many users, sampling is cheap next to the inserts and a worker
+# pool's startup and pickling overhead outweighs any parallel speedup
+POOL_MIN_USERS = 100_000
+
+
+def iter_logs(
+    users: List[Tuple],
+    rng: np.random.Generator,
+    processes: int = 1
+) -> Iterator[Tuple]:
+    """
+    Yield synthetic log rows for the given users.
+    
+    Rows are sampled in batches of USERS_PER_BATCH users, each drawing from
+    its own child seed of rng, so the output does not depend on the number
+    of processes. With processes > 1 and at least POOL_MIN_USERS users, the
+    batches are spread over a pool of worker processes while the caller
+    consumes (and inserts) the rows in the main process.
+    
+    Args:
+        users: (user_id, signup_date, segment) rows
+        rng: Random number generator the batch seeds are derived from
+        processes: Number of worker processes (default: sample in the calling
+                   process)
+    
+    Yields:
+        (user_id, event_name, event_timestamp, value) tuples
+    """
+    today = np.datetime64(datetime.now().date())
+    starts = range(0, len(users), USERS_PER_BATCH)
+    seeds = np.random.SeedSequence(rng.integers(2**63)).spawn(len(starts))
+    tasks = [(users[start:start + USERS_PER_BATCH], today, seed) for start, seed in zip(starts, seeds)]
+    
+    processes = min(processes, len(tasks))
+    if processes <= 1 or len(users) < POOL_MIN_USERS:
+        for columns in map(_sample_logs, tasks):
+            yield from zip(*columns)
+        return
+    
+    with Pool(processes) as pool:
+        for columns in pool.imap(_sample_logs, tasks):
+            yield from zip(*columns)
+
+
+def _sample_logs(
+    task: Tuple[List[Tuple], np.datetime64, np.random.SeedSequence]
+) -> Tuple[List, List, List, List]:
+    """
+    Sample the logs of a batch of users from their signup date to today.
+    
+    Args:
+        task: (users, today, seed) - the batch's (user_id, signup_date,
+              segment) rows, the last simulated day and the batch's seed
+    
+    Returns:
+        user_id, event_name, event_timestamp and value columns
+    """
+    users, today, seed = task
+    rng = np.random.default_rng(seed)
+    
+    # Per-user activity pattern
+    patterns = [BEHAVIOR_PATTERNS.get(segment, BEHAVIOR_PATTERNS['medium_potential']) for _, _, segment in users]
+    user_ids = np.array([user[0] for user in users])
+    signup_dates = np.array([user[1] for user in users], dtype='datetime64[D]')
+    min_events = np.array([pattern['daily_events'][0] for pattern in patterns])
+    max_events = np.array([pattern['daily_events'][1] for pattern in patterns])
+    reward_probs = np.array([pattern['reward_prob'] for pattern in patterns])
+    
+    # Simulate behavior from signup date to today: one row per (user, day)
+    days_alive = np.maximum((today - signup_dates).astype(np.int64) + 1, 0)
+    day_user = np.repeat(np.arange(len(users)), days_alive)
+    day_index = np.arange(len(day_user)) - np.repeat(np.cumsum(days_alive) - days_alive, days_alive)
+    
+    # Determine number of events for each day
+    num_events = rng.integers(min_events[day_user], max_events[day_user] + 1)
+    
+    # Expand to one row per event
+    event_user = np.repeat(day_user, num_events)
+    event_day = np.repeat(day_index, num_events)
+    log_count = len(event_user)
+    
+    # Generate event timestamps (random time during the day, active hours 6 AM to 11 PM),
+    # stored as Unix epoch seconds
+    seconds = rng.integers(6, 24, log_count) * 3600 + rng.integers(0, 60, log_count) * 60 + rng.integers(0, 60, log_count)
+    event_times = (
+        (signup_dates[event_user] + event_day.astype('timedelta64[D]')).astype('datetime64[s]')
+        + seconds.astype('timedelta64[s]')
+    )
+    
+    # Sample events from the normal event distribution
+    events = rng.choice(len(EVENT_TYPES), size=log_count, p=EVENT_WEIGHTS).astype(np.int8)
+    
+    # Higher chance of reward on the first day: until a user's first reward,
+    # each first-day event is a reward with probability reward_prob * 1.5 and
+    # an app_open/activity_completed/app_close event otherwise
+    first_day = np.flatnonzero(event_day == 0)
+    first_day_user = event_user[first_day]
+    hit = rng.random(len(first_day)) < reward_probs[first_day_user] * 1.5
+    hits_so_far = np.cumsum(hit)
+    group_start = np.flatnonzero(np.diff(first_day_user, prepend=-1) != 0)
+    hits_before = hits_so_far - hit - np.repeat(
+        hits_so_far[group_start] - hit[group_start], np.diff(np.r_[group_start, len(first_day)])
+    )
+    before_first_reward = hits_before == 0
+    events[first_day[before_first_reward & hit]] = REWARD_EVENT
+    no_reward = first_day[before_first_reward & ~hit]
+    events[no_reward] = rng.choice(NON_REWARD_EVENTS, size=len(no_reward))
+    
+    # Reward amount follows log-normal distribution
+    values = np.full(log_count, None, dtype=object)
+    is_reward = events == REWARD_EVENT
+    values[is_reward] = np.round(rng.lognormal(mean=3.0, sigma=0.5, size=is_reward.sum()), 2).tolist()
+    
+    return (
+        user_ids[event_user].tolist(),
+        np.array(EVENT_TYPES, dtype=object)[events].tolist(),
+        event_times.astype(np.int64).tolist(),
+        values.tolist()
+    )
+
 
 def generate_logs(
     db_path: str = "data/app_data.db",
-    days_to_simulate: int = 60
+    days_to_simulate: int = 60,
+    conn: Optional[sqlite3.Connection] = None,
+    seed: Optional[Union[int, np.random.SeedSequence]] = None
 ) -> None:
     """
     Generate synthetic user behavior logs.
@@ -25,8 +172,12 @@ def generate_logs(
     Args:
         db_path: Path to the SQLite database
         days_to_simulate: Number of days to simulate behavior for
+        conn: Open connection to reuse and leave open (opened from db_path if omitted)
+        seed: Seed for the random number generator (fresh entropy if omitted)
     """
-    conn = sqlite3.connect(db_path)
+    owns_conn = conn is None
+    if owns_conn:
+        conn = connect_for_load(db_path)
     cursor = conn.cursor()
     
     # Fetch all users
@@ -35,93 +186,17 @@ def generate_logs(
     
     print(f"Generating behavior logs for {len(users)} users...")
     
-    # Event types
-    event_types = ['app_open', 'reward_earned', 'activity_completed', 'app_close']
-    
-    # User behavior patterns based on segment
-    behavior_patterns = {
-        'high_potential': {'daily_events': (5, 10), 'reward_prob': 0.7},
-        'medium_potential': {'daily_events': (2, 5), 'reward_prob': 0.4},
-        'low_potential': {'daily_events': (0, 2), 'reward_prob': 0.2}
-    }
-    
-    logs_data: List[Tuple] = []
-    log_count = 0
-    
-    for user_id, signup_date_str, segment in users:
-        signup_date = datetime.strptime(signup_date_str, '%Y-%m-%d')
-        
-        # Determine user's activity pattern
-        pattern = behavior_patterns.get(segment, behavior_patterns['medium_potential'])
-        min_events, max_events = pattern['daily_events']
-        reward_prob = pattern['reward_prob']
-        
-        # Simulate behavior from signup date to today
-        current_date = signup_date
-        end_date = datetime.now()
-        
-        # Track if user earned reward in first 24 hours
-        first_day_reward = False
-        
-        while current_date <= end_date:
-            # Determine number of events for this day
-            num_events = random.randint(min_events, max_events)
-            
-            for _ in range(num_events):
-                # Generate event timestamp (random time during the day)
-                hour = random.randint(6, 23)  # Active hours 6 AM to 11 PM
-                minute = random.randint(0, 59)
-                second = random.randint(0, 59)
-                
-                event_timestamp = current_date.replace(
-                    hour=hour, minute=minute, second=second
-                ).isoformat()
-                
-                # Select event type
-                if not first_day_reward and (current_date - signup_date).days == 0:
-                    # Higher chance of reward on first day
-                    if random.random() < reward_prob * 1.5:
-                        event_name = 'reward_earned'
-                        first_day_reward = True
-                    else:
-                        event_name = random.choice(['app_open', 'activity_completed', 'app_close'])
-                else:
-                    # Normal event distribution
-                    event_weights = [0.3, 0.1, 0.4, 0.2]  # app_open, reward, activity, app_close
-                    event_name = random.choices(event_types, weights=event_weights)[0]
-                
-                # Generate value for reward_earned events
-                value = None
-                if event_name == 'reward_earned':
-                    # Reward amount follows log-normal distribution
-                    value = round(np.random.lognormal(mean=3.0, sigma=0.5), 2)
-                
-                logs_data.append((user_id, event_name, event_timestamp, value))
-                log_count += 1
-            
-            # Move to next day
-            current_date += timedelta(days=1)
-        
-        # Progress indicator
-        if (user_id % 1000) == 0:
-            print(f"  Processed {user_id}/{len(users)} users, {log_count} logs generated...")
-    
-    # Insert logs into database in batches
-    print("Inserting logs into database...")
-    batch_size = 10000
-    for i in range(0, len(logs_data), batch_size):
-        batch = logs_data[i:i + batch_size]
-        cursor.executemany(
-            "INSERT INTO user_logs (user_id, event_name, event_timestamp, value) VALUES (?, ?, ?, ?)",
-            batch
-        )
-        conn.commit()
-        print(f"  Inserted {min(i + batch_size, len(logs_data))}/{len(logs_data)} logs...")
-    
-    conn.close()
+    # Stream the sampled logs into the database in a single transaction
+    log_count = insert_rows(
+        cursor, 'user_logs', ('user_id', 'event_name', 'event_timestamp', 'value'),
+        iter_logs(users, np.random.default_rng(seed))
+    )
+    conn.commit()
+    if owns_conn:
+        conn.close()
     
     print(f"[OK] Successfully generated and inserted {log_count} behavior logs")
-    print(f"  Event types: {event_types}")
+    print(f"  Event types: {EVENT_TYPES}")
     print(f"  Behavior patterns: high_potential (5-10 events/day), medium (2-5), low (0-2)")
 
 
@@ -5,16 +5,24 @@ This module generates 10,000+ virtual users with realistic signup patterns,
 channel distribution, and initial segmentation.
 """
 
+import sys
 import sqlite3
-import random
+from pathlib import Path
 from datetime import datetime, timedelta
-from typing import List, Tuple
+from typing import Optional, Union
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from data_generation._db import connect_for_load
 
 
 def generate_users(
     db_path: str = "data/app_data.db",
     num_users: int = 10000,
-    days_back: int = 60
+    days_back: int = 60,
+    conn: Optional[sqlite3.Connection] = None,
+    seed: Optional[Union[int, np.random.SeedSequence]] = None
 ) -> None:
     """
     Generate synthetic user data and insert into database.
@@ -23,8 +31,12 @@ def generate_users(
         db_path: Path to the SQLite database
         num_users: Number of users to generate
         days_back: Number of days back from today for signup distribution
+        conn: Open connection to reuse and leave open (opened from db_path if omitted)
+        seed: Seed for the random number generator (fresh entropy if omitted)
     """
-    conn = sqlite3.connect(db_path)
+    owns_conn = conn is None
+    if owns_conn:
+        conn = connect_for_load(db_path)
     cursor = conn.cursor()
     
     # Channel distribution: organic 50%, paid 30%, referral 20%
@@ -35,7 +47,7 @@ def generate_users(
     segments = ['high_potential', 'medium_potential', 'low_potential']
     segment_weights = [0.3, 0.5, 0.2]
     
-    users_data: List[Tuple] = []
+    rng = np.random.default_rng(seed)
     
     # Generate signup dates with realistic distribution
     # More signups in recent days
@@ -44,32 +56,27 @@ def generate_users(
     
     print(f"Generating {num_users} users...")
     
-    for user_id in range(1, num_users + 1):
-        # Generate signup date with bias towards recent dates
-        # Use beta distribution for realistic pattern
-        days_offset = int(random.betavariate(2, 5) * days_back)
-        signup_date = (end_date - timedelta(days=days_offset)).strftime('%Y-%m-%d')
-        
-        # Select channel based on weights
-        channel = random.choices(channels, weights=channel_weights)[0]
-        
-        # Select initial segment based on weights
-        segment = random.choices(segments, weights=segment_weights)[0]
-        
-        users_data.append((user_id, signup_date, channel, segment))
-        
-        # Progress indicator
-        if user_id % 1000 == 0:
-            print(f"  Generated {user_id}/{num_users} users...")
+    # Signup dates are biased towards recent dates (beta distribution); every
+    # possible date string is formatted once and looked up by day offset
+    days_offset = (rng.beta(2, 5, num_users) * days_back).astype(np.int32)
+    date_strings = np.array([
+        (end_date - timedelta(days=d)).strftime('%Y-%m-%d') for d in range(days_back + 1)
+    ])
+    signup_dates = date_strings[days_offset]
+    
+    # Select channels and initial segments based on weights
+    user_channels = rng.choice(channels, size=num_users, p=channel_weights)
+    user_segments = rng.choice(segments, size=num_users, p=segment_weights)
     
     # Insert users into database
     cursor.executemany(
         "INSERT INTO users (user_id, signup_date, channel, segment) VALUES (?, ?, ?, ?)",
-        users_data
+        zip(range(1, num_users + 1), signup_dates.tolist(), user_channels.tolist(), user_segments.tolist())
     )
     
     conn.commit()
-    conn.close()
+    if owns_conn:
+        conn.close()
     
     print(f"[OK] Successfully generated and inserted {num_users} users")
     print(f"  Signup date range: {start_date.strftime('%Y-%m-%d')} to {end_date.strftime('%Y-%m-%d')}")
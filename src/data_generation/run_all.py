@@ -11,22 +11,26 @@ This script runs all data generation modules in the correct order:
 import sys
 import time
 from pathlib import Path
+from typing import Optional
+import numpy as np
 
 # Add src directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from data_generation.create_db import create_database
+from data_generation._db import connect_for_load
+from data_generation.create_db import create_database, create_indexes
 from data_generation.generate_users import generate_users
 from data_generation.generate_logs import generate_logs
 from data_generation.generate_ab_test import generate_ab_test
 
 
-def run_all_generation(db_path: str = "data/app_data.db") -> None:
+def run_all_generation(db_path: str = "data/app_data.db", seed: Optional[int] = None) -> None:
     """
     Run complete data generation pipeline.
     
     Args:
         db_path: Path to the SQLite database
+        seed: Seed for the generators, for a reproducible dataset (random if omitted)
     """
     print("=" * 60)
     print("DATA GENERATION PIPELINE")
@@ -35,26 +39,41 @@ def run_all_generation(db_path: str = "data/app_data.db") -> None:
     
     start_time = time.time()
     
+    # Independent child seeds, so the steps' random streams don't repeat each other
+    users_seed, logs_seed, ab_seed = np.random.SeedSequence(seed).spawn(3)
+    
+    # All steps share one connection, so its settings and page cache carry
+    # over between them; each step commits its own transaction
+    Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+    conn = connect_for_load(db_path)
+    
     # Step 1: Create database
     print("[1/4] Creating database schema...")
-    create_database(db_path)
+    create_database(db_path, conn=conn)
     print()
     
     # Step 2: Generate users
     print("[2/4] Generating user data...")
-    generate_users(db_path, num_users=10000, days_back=60)
+    generate_users(db_path, num_users=10000, days_back=60, conn=conn, seed=users_seed)
     print()
     
     # Step 3: Generate behavior logs
     print("[3/4] Generating behavior logs...")
-    generate_logs(db_path, days_to_simulate=60)
+    generate_logs(db_path, days_to_simulate=60, conn=conn, seed=logs_seed)
+    print()
+    
+    # Indexes are built once the bulk of the data is loaded
+    print("Creating indexes...")
+    create_indexes(db_path, conn=conn)
     print()
     
     # Step 4: Generate A/B test data
     print("[4/4] Generating A/B test data...")
-    generate_ab_test(db_path, control_conversion_rate=0.175, treatment_lift=0.12)
+    generate_ab_test(db_path, control_conversion_rate=0.175, treatment_lift=0.12, conn=conn, seed=ab_seed)
     print()
     
+    conn.close()
+    
     elapsed_time = time.time() - start_time
     
     print("=" * 60)